@@ -0,0 +1,293 @@
+import os
+import sys
+import time
+import wave
+import threading
+from array import array
+from collections import OrderedDict
+import pygame
+
+_enabled = True
+
+def set_enabled(flag):
+    """
+    Turns audio off (or back on) for AudioManagers created afterwards
+    (e.g., a replay of a session recorded without a sound device).
+    """
+    global _enabled
+    _enabled = flag
+
+def available():
+    """
+    True if audio is enabled and the mixer can be initialized.
+    """
+    if not _enabled:
+        return False
+    try:
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        return True
+    except pygame.error:
+        return False
+
+class _VoiceStream:
+    """
+    A voice clip read from a PCM WAV file CHUNK_MS at a time. Each chunk is converted
+    to the mixer format (signed 16-bit, mixer rate and channel count) and wrapped in a
+    Sound, so only one chunk of the clip is decoded at any moment, however long it is.
+    `length` (seconds) comes from the WAV header, without reading the samples.
+    """
+
+    CHUNK_MS = 250
+
+    def __init__(self, full_path, mixer_init):
+        self._wav = wave.open(full_path, "rb")
+        if self._wav.getcomptype() != "NONE" or self._wav.getsampwidth() not in (1, 2):
+            self._wav.close()
+            raise ValueError("only uncompressed 8/16-bit PCM WAV voices are supported")
+        self.rate     = self._wav.getframerate()
+        self.channels = self._wav.getnchannels()
+        self.width    = self._wav.getsampwidth()
+        self.length   = self._wav.getnframes() / float(self.rate)
+        self.out_rate, _, self.out_channels = mixer_init
+        self.chunk_frames = max(1, self.rate * self.CHUNK_MS // 1000)
+        self._first = None  # chunk decoded ahead by prefetch()
+
+    def prefetch(self):
+        """
+        Decodes the first chunk now, so playback can start without latency.
+        """
+        if self._first is None:
+            self._first = self._decode()
+
+    def read_chunk(self):
+        """
+        Next chunk as a Sound, or None at the end of the clip.
+        """
+        if self._first is not None:
+            chunk, self._first = self._first, None
+            return chunk
+        return self._decode()
+
+    def _decode(self):
+        raw = self._wav.readframes(self.chunk_frames)
+        if not raw:
+            return None
+        if self.width == 2:
+            samples = array("h", raw)
+            if sys.byteorder == "big":
+                samples.byteswap()  # WAV is little-endian
+        else:
+            samples = array("h", [(b - 128) << 8 for b in raw])  # 8-bit WAV is unsigned
+
+        # Channels and rate: output channel c takes source channel c % channels;
+        # slice assignment keeps the common cases (mono → stereo, 22050 → 44100 Hz) in C
+        if self.channels == self.out_channels and self.rate == self.out_rate:
+            out = samples
+        else:
+            chans = [samples[c::self.channels] for c in range(self.channels)]
+            if self.rate != self.out_rate:
+                chans = [self._resample(ch) for ch in chans]
+            out = array("h", bytes(2 * len(chans[0]) * self.out_channels))
+            for c in range(self.out_channels):
+                out[c::self.out_channels] = chans[c % self.channels]
+        if not out:
+            return None
+        return pygame.mixer.Sound(buffer=out.tobytes())
+
+    def _resample(self, samples):
+        """
+        One channel converted to the mixer rate (each output frame takes the nearest earlier input frame).
+        """
+        if self.out_rate % self.rate == 0:
+            k   = self.out_rate // self.rate
+            out = array("h", bytes(2 * len(samples) * k))
+            for j in range(k):
+                out[j::k] = samples
+            return out
+        n = len(samples) * self.out_rate // self.rate
+        return array("h", [samples[i * self.rate // self.out_rate] for i in range(n)])
+
+    def close(self):
+        self._wav.close()
+
+class AudioManager:
+    """
+    Background music and per-block voice lines, both streamed from disk.
+      - BGM is streamed with pygame.mixer.music (never fully loaded, so memory
+        doesn't grow with track length). play_bgm() with the same file keeps
+        the track playing; None fades it out.
+      - Voice clips (PCM WAV) play on a dedicated channel: a feeder thread decodes
+        _VoiceStream.CHUNK_MS of audio at a time and hands it to Channel.queue(),
+        so at most the playing chunk, the queued one and the one being decoded
+        are in memory. The clip length for voice_sync is read from the header.
+      - The next clip is opened and its first chunk decoded in a background thread
+        (preload_voice), so it starts without latency. At most VOICE_CACHE_SIZE
+        preloaded clips wait in the cache; the playing one is owned by its feeder.
+    Paths are relative to `audio_dir`. If the mixer can't be initialized
+    (no audio device) or audio was turned off with set_enabled(False), every
+    method is a no-op and voice lengths are None.
+    """
+
+    VOICE_CACHE_SIZE = 2
+    BGM_FADE_MS      = 500
+
+    def __init__(self, audio_dir):
+        self.audio_dir = audio_dir
+        self.enabled   = False
+        self.bgm       = None  # relative path of the current track
+        self._voices   = OrderedDict()  # path -> preloaded _VoiceStream (most recent last)
+        self._loading  = {}             # path -> Thread
+        self._playing  = None           # _VoiceStream being fed to the channel
+        self._lock     = threading.Lock()
+        self._missing  = set()
+
+        if not _enabled:
+            return
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self._mixer_init = pygame.mixer.get_init()
+            if self._mixer_init[1] != -16:
+                raise pygame.error(f"unsupported mixer format {self._mixer_init[1]} (voices need -16)")
+            self._channel = pygame.mixer.Channel(0)
+            pygame.mixer.set_reserved(1)  # keep channel 0 for voices
+            self.enabled = True
+        except pygame.error as e:
+            print(f"[audio] Audio disabled: {e}")
+
+    def _full_path(self, path):
+        full = os.path.join(self.audio_dir, path)
+        if not os.path.exists(full):
+            if path not in self._missing:
+                self._missing.add(path)
+                print(f"[audio] File not found: {full}")
+            return None
+        return full
+
+    # ---------- BGM ----------
+
+    def play_bgm(self, path):
+        if not self.enabled or path == self.bgm:
+            return
+        self.bgm = path
+        if path is None:
+            pygame.mixer.music.fadeout(self.BGM_FADE_MS)
+            return
+        full = self._full_path(path)
+        if full is None:
+            pygame.mixer.music.fadeout(self.BGM_FADE_MS)
+            return
+        try:
+            pygame.mixer.music.load(full)
+            pygame.mixer.music.play(-1, fade_ms=self.BGM_FADE_MS)
+        except pygame.error as e:
+            print(f"[audio] Can't play {full}: {e}")
+
+    def stop_bgm(self):
+        self.play_bgm(None)
+
+    # ---------- voice ----------
+
+    def _open_voice(self, path):
+        """
+        Opens `path` as a _VoiceStream with its first chunk decoded, or returns None.
+        """
+        full = self._full_path(path)
+        if full is None:
+            return None
+        try:
+            stream = _VoiceStream(full, self._mixer_init)
+            stream.prefetch()
+        except (OSError, EOFError, wave.Error, ValueError, pygame.error) as e:
+            if path not in self._missing:
+                self._missing.add(path)
+                print(f"[audio] Can't load {full}: {e}")
+            return None
+        return stream
+
+    def _load_voice(self, path):
+        stream = self._open_voice(path)
+        with self._lock:
+            self._loading.pop(path, None)
+            if stream is not None:
+                old = self._voices.pop(path, None)
+                if old is not None:
+                    old.close()
+                self._voices[path] = stream
+                while len(self._voices) > self.VOICE_CACHE_SIZE:
+                    self._voices.popitem(last=False)[1].close()
+
+    def preload_voice(self, path):
+        """
+        Opens `path` and decodes its first chunk in the background
+        (no-op if already preloaded or loading).
+        """
+        if not self.enabled or not path:
+            return
+        with self._lock:
+            if path in self._voices or path in self._loading:
+                return
+            t = threading.Thread(target=self._load_voice, args=(path,), daemon=True)
+            self._loading[path] = t
+        t.start()
+
+    def play_voice(self, path):
+        """
+        Plays `path` (stopping the previous voice). Returns its length in seconds, or None.
+        """
+        if not self.enabled or not path:
+            return None
+        self.stop_voice()
+        with self._lock:
+            pending = self._loading.get(path)
+        if pending is not None:
+            pending.join()
+        with self._lock:
+            stream = self._voices.pop(path, None)
+        if stream is None:
+            stream = self._open_voice(path)
+        if stream is None:
+            return None
+
+        first = stream.read_chunk()
+        if first is None:
+            stream.close()
+            return None
+        with self._lock:
+            self._playing = stream
+            self._channel.play(first)
+        threading.Thread(target=self._feed, args=(stream,), daemon=True).start()
+        return stream.length
+
+    def _feed(self, stream):
+        """
+        Keeps one chunk queued behind the playing one until the clip ends or is stopped.
+        """
+        poll = _VoiceStream.CHUNK_MS / 4000.0
+        chunk = stream.read_chunk()
+        while chunk is not None:
+            with self._lock:
+                if self._playing is not stream:
+                    break
+                if self._channel.get_queue() is None:
+                    self._channel.queue(chunk)
+                    chunk = None
+            if chunk is None:
+                chunk = stream.read_chunk()
+            else:
+                time.sleep(poll)
+        with self._lock:
+            if self._playing is stream:
+                self._playing = None
+        stream.close()
+
+    def stop_voice(self):
+        if self.enabled:
+            with self._lock:
+                self._playing = None
+                self._channel.stop()
+
+    def stop(self):
+        self.stop_voice()
+        self.stop_bgm()
@@ -0,0 +1,191 @@
+import pygame
+import playback
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+
+class Backlog:
+    """
+    Fixed-size ring buffer with the blocks already shown to the player.
+    Stores references to the parser's Block objects (no text copies), so
+    memory stays flat no matter how long the session is.
+      - append(block): adds a block, overwriting the oldest one when full.
+      - backlog[i]:    i-th block, 0 = oldest still kept, len-1 = newest.
+      - seq(i):        absolute number of the i-th block since the session began
+                       (stable while the block is kept; used as a cache key).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self._slots   = [None] * self.capacity
+        self._start   = 0   # slot of the oldest block
+        self._count   = 0
+        self.total    = 0   # blocks appended since creation
+
+    def append(self, block):
+        if self._count < self.capacity:
+            self._slots[(self._start + self._count) % self.capacity] = block
+            self._count += 1
+        else:
+            self._slots[self._start] = block
+            self._start = (self._start + 1) % self.capacity
+        self.total += 1
+
+    def extend(self, blocks):
+        for blk in blocks:
+            self.append(blk)
+
+    def seq(self, i):
+        return self.total - self._count + i
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("backlog index out of range")
+        return self._slots[(self._start + i) % self.capacity]
+
+class BacklogScene:
+    """
+    Scrollable view over a Backlog, opened from GameScene.
+    Only the entries that fit on screen are wrapped and drawn; wrapped lines are
+    cached per entry while the view is open, so scrolling costs the same whatever
+    the backlog size.
+      - ↑ / mouse wheel up:   scroll one entry back.
+      - ↓ / mouse wheel down: scroll one entry forward (past the newest closes the view).
+      - PgUp / PgDn:          scroll one screen.
+      - ESC / BACKSPACE:      close and return to the page.
+    """
+
+    def __init__(self, screen, backlog, renderer):
+        self.screen   = screen
+        self.backlog  = backlog
+        self.renderer = renderer
+
+        self.line_height = renderer.line_height
+        self.top_y       = renderer.title_area_height + renderer.block_spacing
+        self.bottom_y    = SCREEN_HEIGHT - 50
+        self.text_width  = renderer.text_area_width
+
+        self.bottom_i    = len(backlog) - 1  # newest visible entry (anchored at the bottom)
+        self._layout     = {}                # seq -> wrapped lines
+        self._at_top     = True              # oldest entry fully visible after last draw
+        self._page_count = 1                 # entries drawn in the last frame
+
+    def run(self, pending=()):
+        """
+        `pending`: events already polled by the caller (the rest of the batch that
+        opened the view, e.g. more wheel steps); they are handled first.
+        """
+        if len(self.backlog) == 0:
+            return
+
+        # Draw before handling any input, so _scroll knows whether the oldest entry is visible
+        self._draw()
+        playback.flip()
+        dirty = False
+        while True:
+            events, pending = list(pending) + playback.events(), ()
+            for ev in events:
+                if ev.type == pygame.QUIT:
+                    pygame.quit()
+                    exit()
+                elif ev.type == pygame.MOUSEWHEEL:
+                    if ev.y > 0:
+                        dirty |= self._scroll(-1)
+                    elif ev.y < 0:
+                        if self.bottom_i == len(self.backlog) - 1:
+                            return
+                        dirty |= self._scroll(1)
+                elif ev.type == pygame.KEYDOWN:
+                    if ev.key in (pygame.K_ESCAPE, pygame.K_BACKSPACE):
+                        return
+                    elif ev.key == pygame.K_UP:
+                        dirty |= self._scroll(-1)
+                    elif ev.key == pygame.K_DOWN:
+                        if self.bottom_i == len(self.backlog) - 1:
+                            return
+                        dirty |= self._scroll(1)
+                    elif ev.key == pygame.K_PAGEUP:
+                        dirty |= self._scroll(-self._page_count)
+                    elif ev.key == pygame.K_PAGEDOWN:
+                        dirty |= self._scroll(self._page_count)
+
+            if dirty:
+                self._draw()
+                playback.flip()
+                dirty = False
+            playback.tick(60)
+
+    def _scroll(self, delta):
+        """
+        Moves the bottom anchor; returns True if the view changed.
+        """
+        if delta < 0 and self._at_top:
+            return False
+        new_i = max(0, min(len(self.backlog) - 1, self.bottom_i + delta))
+        if new_i == self.bottom_i:
+            return False
+        self.bottom_i = new_i
+        return True
+
+    def _lines(self, i):
+        """
+        Wrapped lines for backlog entry i (computed once while the view is open).
+        """
+        key = self.backlog.seq(i)
+        lines = self._layout.get(key)
+        if lines is None:
+            blk  = self.backlog[i]
+            text = self.renderer.INLINE_COLOR_PATTERN.sub(r"\2", blk.content)
+            if blk.speaker:
+                text = f"[{blk.speaker}] {text}"
+            font  = self.renderer.italic_font if blk.type == "thinking" else self.renderer.font
+            lines = self.renderer._wrap_text(text, font, self.text_width) or [""]
+            self._layout[key] = lines
+        return lines
+
+    def _draw(self):
+        r = self.renderer
+        self.screen.fill((0, 0, 0))
+
+        w, h = r.font.size("Backlog")
+        r.blit_text(r.font, "Backlog", ((SCREEN_WIDTH - w) // 2, self.line_height // 2 + 5 - h // 2), (255, 255, 255))
+
+        # Lay out entries upward from the bottom anchor, stopping once the area is full
+        self.screen.set_clip(pygame.Rect(0, self.top_y, SCREEN_WIDTH, self.bottom_y - self.top_y))
+        y = self.bottom_y
+        i = self.bottom_i
+        drawn = 0
+        entry_top = y
+        while i >= 0 and y > self.top_y:
+            blk   = self.backlog[i]
+            lines = self._lines(i)
+            y    -= len(lines) * self.line_height
+            entry_top = y
+            if blk.type == "location":
+                color, font = r.subtitle_color_default, r.font
+            elif blk.type == "thinking":
+                color, font = r.text_color_default, r.italic_font
+            else:
+                color, font = r.text_color_default, r.font
+            if blk.type in ("dialog", "thinking"):
+                bg = r.dialogue_bg_default if blk.type == "dialog" else r.thinking_bg_default
+                pygame.draw.rect(self.screen, bg,
+                                 (r.margin_x - 5, y - 2, self.text_width + 10, len(lines) * self.line_height + 4))
+            ly = y
+            for line in lines:
+                r.blit_text(font, line, (r.margin_x, ly), color)
+                ly += self.line_height
+            y -= r.block_spacing // 2
+            drawn += 1
+            i -= 1
+        self.screen.set_clip(None)
+
+        self._at_top     = (i < 0 and entry_top >= self.top_y)
+        self._page_count = max(1, drawn - 1)
+
+        footer_font = r.get_font(18)
+        footer = "↑ ↓ scroll     (PgUp/PgDn page)     (ESC close)"
+        r.blit_text(footer_font, footer, ((SCREEN_WIDTH - footer_font.size(footer)[0]) // 2, SCREEN_HEIGHT - 30), (200, 200, 200))
@@ -0,0 +1,350 @@
+"""
+Branching support: choices, jumps and variables compiled into a section graph.
+
+Expressions (conditions and right-hand side of assignments):
+  literals:    12, 0.5, true, false, "text" / 'text'
+  variables:   trust, has_key               (undefined variables read as 0)
+  operators:   + -   == != < <= > >=   not and or   ( )
+
+Each expression is compiled once into postfix bytecode, a tuple of ops:
+  ("const", value) | ("load", name) | (binary_op,) | ("not",) | ("neg",)
+and evaluated by `run_code` with a small stack machine.
+"""
+
+import re
+import operator
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+      (?P<num>\d+\.\d+|\d+)
+    | (?P<str>"[^"]*"|'[^']*')
+    | (?P<name>[A-Za-z_]\w*)
+    | (?P<op>==|!=|<=|>=|<|>|\+|-|\(|\))
+    )""", re.VERBOSE)
+
+KEYWORDS   = ("and", "or", "not", "true", "false")
+COMPARISON = {"==": "eq", "!=": "ne", "<": "lt", "<=": "le", ">": "gt", ">=": "ge"}
+BINARY_OPS = {
+    "add": operator.add, "sub": operator.sub,
+    "eq":  operator.eq,  "ne":  operator.ne,
+    "lt":  operator.lt,  "le":  operator.le,
+    "gt":  operator.gt,  "ge":  operator.ge,
+    "and": lambda a, b: bool(a) and bool(b),
+    "or":  lambda a, b: bool(a) or bool(b),
+}
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = TOKEN_PATTERN.match(text, pos)
+        if m is None or m.end() == pos:
+            raise ValueError(f"Unexpected character in expression: {text[pos:]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        tokens.append((kind, m.group(kind)))
+    return tokens
+
+class _ExprCompiler:
+    """
+    Recursive descent: or > and > not > comparison > additive > unary > primary.
+    """
+
+    def __init__(self, text):
+        self.tokens = _tokenize(text)
+        self.pos    = 0
+        self.code   = []
+        self.names  = set()
+
+    def compile(self):
+        if not self.tokens:
+            raise ValueError("Empty expression")
+        self._or()
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Unexpected token: {self.tokens[self.pos][1]!r}")
+        return tuple(self.code)
+
+    def _peek(self):
+        return self.tokens[self.pos][1] if self.pos < len(self.tokens) else None
+
+    def _next(self):
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def _or(self):
+        self._and()
+        while self._peek() == "or":
+            self._next()
+            self._and()
+            self.code.append(("or",))
+
+    def _and(self):
+        self._not()
+        while self._peek() == "and":
+            self._next()
+            self._not()
+            self.code.append(("and",))
+
+    def _not(self):
+        if self._peek() == "not":
+            self._next()
+            self._not()
+            self.code.append(("not",))
+        else:
+            self._comparison()
+
+    def _comparison(self):
+        self._additive()
+        if self._peek() in COMPARISON:
+            op = COMPARISON[self._next()[1]]
+            self._additive()
+            self.code.append((op,))
+
+    def _additive(self):
+        self._unary()
+        while self._peek() in ("+", "-"):
+            op = "add" if self._next()[1] == "+" else "sub"
+            self._unary()
+            self.code.append((op,))
+
+    def _unary(self):
+        if self._peek() == "-":
+            self._next()
+            self._unary()
+            self.code.append(("neg",))
+        else:
+            self._primary()
+
+    def _primary(self):
+        if self.pos >= len(self.tokens):
+            raise ValueError("Unexpected end of expression")
+        kind, value = self._next()
+        if kind == "num":
+            self.code.append(("const", float(value) if "." in value else int(value)))
+        elif kind == "str":
+            self.code.append(("const", value[1:-1]))
+        elif kind == "name" and value in ("true", "false"):
+            self.code.append(("const", value == "true"))
+        elif kind == "name" and value not in KEYWORDS:
+            self.code.append(("load", value))
+            self.names.add(value)
+        elif value == "(":
+            self._or()
+            if self._peek() != ")":
+                raise ValueError("Missing ')'")
+            self._next()
+        else:
+            raise ValueError(f"Unexpected token: {value!r}")
+
+def compile_expr(text):
+    """
+    Compiles an expression string. Returns (bytecode, set of variable names read).
+    Raises ValueError on syntax errors.
+    """
+    comp = _ExprCompiler(text)
+    return comp.compile(), comp.names
+
+def run_code(code, variables):
+    """
+    Evaluates compiled bytecode against the `variables` dict.
+    Type errors (e.g. comparing text with a number) evaluate to None.
+    """
+    stack = []
+    push  = stack.append
+    pop   = stack.pop
+    try:
+        for op in code:
+            name = op[0]
+            if name == "const":
+                push(op[1])
+            elif name == "load":
+                push(variables.get(op[1], 0))
+            elif name == "not":
+                push(not pop())
+            elif name == "neg":
+                push(-pop())
+            else:
+                b = pop()
+                push(BINARY_OPS[name](pop(), b))
+    except TypeError:
+        return None
+    return stack[-1] if stack else None
+
+class Choice:
+    """
+    A compiled choice: text shown to the player, target section index, optional condition bytecode.
+    """
+    __slots__ = ("text", "target", "cond")
+
+    def __init__(self, text, target, cond=None):
+        self.text   = text
+        self.target = target
+        self.cond   = cond
+
+    def __getstate__(self):
+        return (self.text, self.target, self.cond)
+
+    def __setstate__(self, state):
+        self.text, self.target, self.cond = state
+
+class SectionGraph:
+    """
+    Compiled flow of a chapter. For section index i:
+      - effects[i]: [(variable, bytecode)] applied when the section is entered.
+      - choices[i]: [Choice]; if any is visible, the player must pick one.
+      - jumps[i]:   [(bytecode or None, target index)]; first true one wins when → is pressed.
+      - otherwise → goes to i + 1 (or ends the chapter after the last section).
+
+    `index` is the section id → index jump table; targets are stored as indices,
+    so branching at runtime never looks anything up by name.
+
+    Static analysis (ignoring conditions, i.e. every edge may be taken):
+      - unreachable: section ids that can't be reached from the first section.
+      - dead_ends:   reachable section ids from which no ending can be reached.
+      - warnings:    human-readable list with the above plus unknown targets,
+                     invalid expressions and variables read but never set.
+    """
+
+    def __init__(self, section_ids, sections=None, variables=None):
+        self.section_ids  = list(section_ids)
+        self.index        = {sid: i for i, sid in enumerate(self.section_ids)}
+        self.initial_vars = dict(variables or {})
+        n = len(self.section_ids)
+        self.effects  = [[] for _ in range(n)]
+        self.choices  = [[] for _ in range(n)]
+        self.jumps    = [[] for _ in range(n)]
+        self.warnings = []
+
+        read, written = set(), set(self.initial_vars)
+        for i, sid in enumerate(self.section_ids):
+            if sections is None:
+                continue
+            sec = sections[sid]
+
+            for name, op, expr in sec.effects:
+                code = self._compile(sid, expr, read)
+                if code is None:
+                    continue
+                if op == "+=":
+                    code = (("load", name),) + code + (("add",),)
+                    read.add(name)
+                elif op == "-=":
+                    code = (("load", name),) + code + (("sub",),)
+                    read.add(name)
+                self.effects[i].append((name, code))
+                written.add(name)
+
+            for text, target, cond in sec.choices:
+                t = self._target(sid, target)
+                if t is None:
+                    continue
+                code = self._compile(sid, cond, read) if cond else None
+                if cond and code is None:
+                    continue
+                self.choices[i].append(Choice(text, t, code))
+
+            for target, cond in sec.jumps:
+                t = self._target(sid, target)
+                if t is None:
+                    continue
+                code = self._compile(sid, cond, read) if cond else None
+                if cond and code is None:
+                    continue
+                self.jumps[i].append((code, t))
+
+        for name in sorted(read - written):
+            self.warnings.append(f"variable '{name}' is read but never set (reads as 0)")
+
+        self._analyze()
+
+    def _compile(self, sid, expr, read):
+        try:
+            code, names = compile_expr(expr)
+        except ValueError as e:
+            self.warnings.append(f"section '{sid}': invalid expression {expr!r} ({e}); ignored")
+            return None
+        read.update(names)
+        return code
+
+    def _target(self, sid, target):
+        t = self.index.get(target)
+        if t is None:
+            self.warnings.append(f"section '{sid}': unknown target '{target}'; ignored")
+        return t
+
+    # ---------- static analysis ----------
+
+    def _static_edges(self, i):
+        """
+        Every transition that may happen from section i. None means "chapter ends".
+        """
+        edges = [c.target for c in self.choices[i]]
+        all_choices_conditional = all(c.cond is not None for c in self.choices[i])
+        if all_choices_conditional:
+            unconditional_jump = False
+            for cond, t in self.jumps[i]:
+                edges.append(t)
+                if cond is None:
+                    unconditional_jump = True
+                    break
+            if not unconditional_jump:
+                edges.append(i + 1 if i + 1 < len(self.section_ids) else None)
+        return edges
+
+    def _analyze(self):
+        n = len(self.section_ids)
+        forward = [self._static_edges(i) for i in range(n)]
+
+        reachable = set()
+        stack = [0] if n else []
+        while stack:
+            i = stack.pop()
+            if i in reachable:
+                continue
+            reachable.add(i)
+            stack.extend(t for t in forward[i] if t is not None)
+
+        backward = [[] for _ in range(n)]
+        can_end  = set()
+        for i in range(n):
+            for t in forward[i]:
+                if t is None:
+                    can_end.add(i)
+                else:
+                    backward[t].append(i)
+        stack = list(can_end)
+        while stack:
+            i = stack.pop()
+            for j in backward[i]:
+                if j not in can_end:
+                    can_end.add(j)
+                    stack.append(j)
+
+        self.unreachable = [self.section_ids[i] for i in range(n) if i not in reachable]
+        self.dead_ends   = [self.section_ids[i] for i in sorted(reachable) if i not in can_end]
+        for sid in self.unreachable:
+            self.warnings.append(f"section '{sid}' is unreachable")
+        for sid in self.dead_ends:
+            self.warnings.append(f"section '{sid}' can never reach an ending")
+
+    # ---------- runtime ----------
+
+    def apply_effects(self, i, variables):
+        for name, code in self.effects[i]:
+            variables[name] = run_code(code, variables)
+
+    def visible_choices(self, i, variables):
+        return [c for c in self.choices[i] if c.cond is None or run_code(c.cond, variables)]
+
+    def next_index(self, i, variables):
+        """
+        Section index reached with → from section i (no choice involved), or None at the end.
+        """
+        for cond, t in self.jumps[i]:
+            if cond is None or run_code(cond, variables):
+                return t
+        return i + 1 if i + 1 < len(self.section_ids) else None
+
+    def is_end(self, i, variables):
+        return not self.visible_choices(i, variables) and self.next_index(i, variables) is None
@@ -0,0 +1,221 @@
+import os
+import sys
+import glob
+import mmap
+import pickle
+import struct
+from collections.abc import Mapping
+
+from parser import ContentParser, Block, Section
+from branching import SectionGraph
+from settings import CHAPTERS_DIR, ARCHIVE_FILE
+
+class ChapterArchive:
+    """
+    Read-only packed chapter archive (built with `python chapter_archive.py`).
+    All chapters are stored already parsed, so the game never opens or parses YAML
+    for them. File layout:
+
+      MAGIC (8 bytes) | index offset (u64) | index length (u64)
+      section payloads ...   (one pickled list of block tuples per section)
+      graph payloads ...     (one pickled SectionGraph per chapter)
+      index                  (pickled dict, see below)
+
+    Index:
+      { "chapter1.yml": {"title": "...", "settings": {...}, "variables": {...}, "music": {...},
+                         "section_ids": [...], "sections": {section_id: (offset, length)},
+                         "graph": (offset, length)} }
+
+    The compiled SectionGraph (jump table, conditions) is stored as-is, so branching
+    chapters need no compile step when loaded from the archive.
+
+    The file is opened with mmap; only the index is unpickled on open (enough to list
+    titles), the graph is unpickled when its chapter is loaded, and each section is
+    unpickled from its own byte range the first time it is needed.
+    """
+
+    MAGIC  = b"PYVNPAK1"
+    HEADER = struct.Struct("<8sQQ")
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_off, index_len = self.HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC:
+            self._mm.close()
+            raise ValueError(f"Not a chapter archive:\n  {path}")
+        self.index = pickle.loads(self._mm[index_off:index_off + index_len])
+
+        st = os.stat(path)
+        self.stamp = ("archive", st.st_mtime_ns, st.st_size)
+
+    def __contains__(self, filename):
+        return filename in self.index
+
+    def chapters(self):
+        return sorted(self.index)
+
+    def title(self, filename):
+        return self.index[filename]["title"]
+
+    def load_section(self, filename, section_id):
+        off, length = self.index[filename]["sections"][section_id]
+        raw_blocks = pickle.loads(self._mm[off:off + length])
+        return Section(section_id, [Block(t, c, s, o) for t, c, s, o in raw_blocks])
+
+    def load_graph(self, filename):
+        """
+        The chapter's compiled SectionGraph, or None for archives built before branching existed.
+        """
+        rng = self.index[filename].get("graph")
+        if rng is None:
+            return None
+        off, length = rng
+        return pickle.loads(self._mm[off:off + length])
+
+    def load_chapter(self, filename):
+        return ArchivedChapter(self, filename)
+
+    def close(self):
+        self._mm.close()
+
+class _ArchivedSections(Mapping):
+    """
+    Read-only { section_id: Section } view that loads each section from the archive on first access.
+    """
+
+    def __init__(self, archive, filename, section_ids):
+        self._archive     = archive
+        self._filename    = filename
+        self._section_ids = section_ids
+        self._loaded      = {}
+
+    def __getitem__(self, section_id):
+        sec = self._loaded.get(section_id)
+        if sec is None:
+            if section_id not in self._archive.index[self._filename]["sections"]:
+                raise KeyError(section_id)
+            sec = self._archive.load_section(self._filename, section_id)
+            self._loaded[section_id] = sec
+        return sec
+
+    def __contains__(self, section_id):
+        return section_id in self._archive.index[self._filename]["sections"]
+
+    def __iter__(self):
+        return iter(self._section_ids)
+
+    def __len__(self):
+        return len(self._section_ids)
+
+class ArchivedChapter:
+    """
+    Same attributes as ContentParser (chapter_path, title, settings, sections, section_ids,
+    variables, music, graph), backed by a ChapterArchive instead of a YAML file.
+    """
+
+    def __init__(self, archive, filename):
+        entry = archive.index[filename]
+        self.chapter_path = f"{archive.path}:{filename}"
+        self.title        = entry["title"]
+        self.settings     = dict(entry["settings"])
+        self.section_ids  = list(entry["section_ids"])
+        self.sections     = _ArchivedSections(archive, filename, self.section_ids)
+        self.variables    = dict(entry.get("variables", {}))
+        self.music        = dict(entry.get("music", {}))
+        # Archives built before branching existed have no graph: linear flow
+        self.graph        = (archive.load_graph(filename)
+                             or SectionGraph(self.section_ids, variables=self.variables))
+
+# ---------- lookup: loose files override the archive ----------
+
+_archive_cache = {}
+
+def open_archive(path=ARCHIVE_FILE):
+    """
+    Returns the (cached) ChapterArchive at `path`, or None if missing/invalid.
+    """
+    if path in _archive_cache:
+        return _archive_cache[path]
+    archive = None
+    if os.path.exists(path):
+        try:
+            archive = ChapterArchive(path)
+        except Exception as e:
+            print(f"[chapter_archive] Ignoring archive {path}: {e}")
+    _archive_cache[path] = archive
+    return archive
+
+def list_chapters(chapters_dir=CHAPTERS_DIR, archive=None):
+    """
+    Sorted chapter filenames from the archive plus loose .yml files in `chapters_dir`.
+    """
+    names = {os.path.basename(f) for f in glob.glob(os.path.join(chapters_dir, "*.yml"))}
+    archive = archive or open_archive()
+    if archive is not None:
+        names.update(archive.chapters())
+    return sorted(names)
+
+def load_chapter(filename, chapters_dir=CHAPTERS_DIR, archive=None):
+    """
+    Returns a parsed chapter. A loose file in `chapters_dir` wins over the archive
+    (so chapters can be modded without rebuilding it).
+    """
+    path = os.path.join(chapters_dir, filename)
+    archive = archive or open_archive()
+    if os.path.exists(path) or archive is None or filename not in archive:
+        return ContentParser(path)
+    return archive.load_chapter(filename)
+
+# ---------- build step ----------
+
+def build_archive(chapters_dir=CHAPTERS_DIR, out_path=ARCHIVE_FILE):
+    """
+    Parses every .yml in `chapters_dir` and writes them to a single archive at `out_path`.
+    Returns the number of chapters packed.
+    """
+    index = {}
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(ChapterArchive.HEADER.pack(ChapterArchive.MAGIC, 0, 0))
+
+        for path in sorted(glob.glob(os.path.join(chapters_dir, "*.yml"))):
+            filename = os.path.basename(path)
+            parser = ContentParser(path)
+            sections = {}
+            for section_id in parser.section_ids:
+                blocks = [(b.type, b.content, b.speaker, b.overrides)
+                          for b in parser.sections[section_id].blocks]
+                data = pickle.dumps(blocks, protocol=pickle.HIGHEST_PROTOCOL)
+                sections[section_id] = (f.tell(), len(data))
+                f.write(data)
+            data  = pickle.dumps(parser.graph, protocol=pickle.HIGHEST_PROTOCOL)
+            graph = (f.tell(), len(data))
+            f.write(data)
+            index[filename] = {
+                "title":       parser.title,
+                "settings":    parser.settings,
+                "section_ids": list(parser.section_ids),
+                "sections":    sections,
+                "variables":   parser.variables,
+                "music":       parser.music,
+                "graph":       graph,
+            }
+
+        index_off = f.tell()
+        data = pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
+        f.write(data)
+        f.seek(0)
+        f.write(ChapterArchive.HEADER.pack(ChapterArchive.MAGIC, index_off, len(data)))
+
+    os.replace(tmp_path, out_path)
+    return len(index)
+
+if __name__ == "__main__":
+    # Usage: python chapter_archive.py [chapters_dir] [output_file]
+    src = sys.argv[1] if len(sys.argv) > 1 else CHAPTERS_DIR
+    out = sys.argv[2] if len(sys.argv) > 2 else ARCHIVE_FILE
+    count = build_archive(src, out)
+    print(f"Packed {count} chapters into {out}")
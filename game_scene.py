@@ -1,46 +1,70 @@
 import os
 import pygame
-from parser import ContentParser
+import playback
+from chapter_archive import load_chapter
 from renderer import TextRenderer
+from backlog import Backlog, BacklogScene
+from audio import AudioManager
 
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT, CHAPTERS_DIR
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, CHAPTERS_DIR, BACKLOG_SIZE, AUDIO_DIR
 from save_manager import load_progress, save_progress
 
 class GameScene:
     """
     Displays each chapter section as a full page.
     - ←/→/ENTER/ESC for navigation.
+    - ↑ (or mouse wheel up) opens the backlog with the blocks already shown.
     - ESC returns to menu at any time.
-    - Progress is saved in progress.pkl.
+    - Branching (see parser.SectionGraph): → follows the page's jumps (or the next
+      page); if the page has visible choices, 1–9 picks one instead. ← returns to the
+      previously visited page and restores the variables as they were there.
+    - Progress (page, completed, variables and the ← history) is saved in progress.pkl,
+      so ← after resuming still goes back along the path actually taken.
+    - Audio: a section listed under `music:` switches the BGM when shown; the voice
+      of the previous page stops on page change, and the first voice clip of the
+      next page is preloaded while the player reads.
+    - `start_section` (optional) opens the chapter directly at that section id
+      (used by the menu search), overriding the saved page; ← then returns to the saved page.
     """
 
-    def __init__(self, screen, chapter_filename):
+    def __init__(self, screen, chapter_filename, start_section=None):
         self.screen           = screen
         self.chapter_filename = chapter_filename
         self.full_path        = os.path.join(CHAPTERS_DIR, chapter_filename)
 
-        # Parse chapter: get title and sections
-        parser = ContentParser(self.full_path)
+        # Parse chapter (loose .yml in CHAPTERS_DIR, else the packed archive): get title and sections
+        parser = load_chapter(chapter_filename)
         self.title       = parser.title
         self.sections    = parser.sections    # { section_id: Section(...) }
         self.section_ids = parser.section_ids # ordered list
+        self.graph       = parser.graph       # compiled jumps/choices/effects
+        self.music       = parser.music       # { section_id: BGM path or None }
 
         self.total_pages = len(self.section_ids)
         self.current_i   = 0  # current page index
+        self.variables   = {}
+        self.history     = [] # (page index, variables) of pages left going forward, for ←
+        self.selected_choice = None
+        self._pending_events = []  # rest of the event batch that opened the backlog
 
-        self.renderer = TextRenderer(screen, parser.settings)
+        self.audio    = AudioManager(AUDIO_DIR)
+        self.renderer = TextRenderer(screen, parser.settings, self.audio)
+        self.backlog  = Backlog(BACKLOG_SIZE)
 
         # Load or initialize progress
         self.progress = load_progress()
         if chapter_filename not in self.progress:
             self.progress[chapter_filename] = {"last_page": 0, "completed": False}
 
-        # Restart if already completed
+        # Restart if already completed (variables and history start over too)
+        saved_vars    = self.progress[chapter_filename].get("variables")
+        saved_history = self.progress[chapter_filename].get("history", [])
         if self.progress[chapter_filename].get("completed", False):
+            saved_vars    = None
+            saved_history = []
             self.current_i = 0
             self.progress[chapter_filename]["last_page"] = 0
             self.progress[chapter_filename]["completed"] = False
-            save_progress(self.progress)
         else:
             last = self.progress[chapter_filename].get("last_page", 0)
             if 0 <= last < self.total_pages:
@@ -48,30 +72,66 @@ class GameScene:
             else:
                 self.current_i = 0
 
-    def run(self):
-        clock = pygame.time.Clock()
+        # Variables: saved state, or initial values + effects of the starting page
+        if saved_vars is not None:
+            self.variables = dict(saved_vars)
+            # Drop entries that no longer exist if the chapter was edited since the save
+            self.history = [(i, dict(v)) for i, v in saved_history if 0 <= i < self.total_pages]
+        else:
+            self.variables = dict(self.graph.initial_vars)
+            if self.total_pages:
+                self.graph.apply_effects(self.current_i, self.variables)
+            self.progress[chapter_filename]["variables"] = dict(self.variables)
+            save_progress(self.progress)
+
+        # Jump straight to a section (e.g., chosen from a search result)
+        # (entered going forward: the page's effects apply and ← returns to the saved page)
+        if start_section in self.graph.index and self.graph.index[start_section] != self.current_i:
+            self._go_to(self.graph.index[start_section])
 
+    def run(self):
+        # Only pages entered going forward go to the backlog (not ENTER redraws or ← revisits)
+        entered_forward = True
         while True:
             # Render current section as a page
             sec_id = self.section_ids[self.current_i]
             section = self.sections[sec_id]
             blocks  = section.blocks
 
+            self.audio.stop_voice()
+            if sec_id in self.music:
+                self.audio.play_bgm(self.music[sec_id])
+
             self.renderer.render_section(
                 blocks,
                 self.title,
                 current_page = self.current_i + 1,
                 total_pages  = self.total_pages
             )
+            if entered_forward:
+                self.backlog.extend(blocks)
 
-            pygame.event.clear()
-            pygame.event.pump()
+            choices = self.graph.visible_choices(self.current_i, self.variables)
+            if choices:
+                self.renderer.draw_choices([c.text for c in choices])
+            else:
+                self._preload_next_voice()
 
-            # Wait for navigation input
-            choice = self._navigation_loop()
+            playback.clear_events()
+            playback.pump()
 
+            # Wait for navigation input (the backlog returns to the same page)
+            choice = self._navigation_loop(len(choices))
+            while choice == "backlog":
+                self._open_backlog()
+                choice = self._navigation_loop(len(choices))
+
+            entered_forward = choice in ("proximo", "escolha")
             if choice == "voltar":
-                if self.current_i == 0:
+                if self.history:
+                    # Back to the page we came from, with its variables
+                    self.current_i, self.variables = self.history.pop()
+                elif self.current_i == 0:
                     # At first section, ← returns to menu
                     self._save_and_return_menu()
                     return
@@ -79,12 +139,16 @@ class GameScene:
                     self.current_i -= 1
 
             elif choice == "proximo":
-                if self.current_i == self.total_pages - 1:
-                    # At last section, → returns to menu
+                nxt = self.graph.next_index(self.current_i, self.variables)
+                if nxt is None:
+                    # At the end of the chapter, → returns to menu
                     self._save_and_return_menu()
                     return
                 else:
-                    self.current_i += 1
+                    self._go_to(nxt)
+
+            elif choice == "escolha":
+                self._go_to(choices[self.selected_choice].target)
 
             elif choice == "mesma":
                 # Redraw current section
@@ -97,41 +161,89 @@ class GameScene:
 
             # Save progress
             self._update_progress()
-            clock.tick(60)
+            playback.tick(60)
 
-    def _navigation_loop(self):
+    def _go_to(self, index):
         """
-        Waits for ←, →, ENTER or ESC.
-        Returns: "voltar", "proximo", "mesma", or "menu".
+        Moves forward to page `index` (jump, choice or next page) and applies its effects.
+        """
+        self.history.append((self.current_i, dict(self.variables)))
+        self.current_i = index
+        self.graph.apply_effects(index, self.variables)
+
+    def _preload_next_voice(self):
+        """
+        Starts decoding the first voice clip of the page → leads to.
+        """
+        nxt = self.graph.next_index(self.current_i, self.variables)
+        if nxt is None:
+            return
+        for blk in self.sections[self.section_ids[nxt]].blocks:
+            voice = (blk.overrides or {}).get("voice")
+            if voice:
+                self.audio.preload_voice(voice)
+                return
+
+    def _navigation_loop(self, num_choices=0):
+        """
+        Waits for ←, →, ENTER, ESC, ↑ / mouse wheel up or, with choices on screen, 1–9
+        (→ is disabled while a choice is pending).
+        Returns: "voltar", "proximo", "mesma", "menu", "backlog" or "escolha"
+        (the picked index is stored in self.selected_choice; for "backlog", the events
+        after the one that opened it are kept in self._pending_events).
         """
         while True:
-            for ev in pygame.event.get():
+            evs = playback.events()
+            for n, ev in enumerate(evs):
                 if ev.type == pygame.QUIT:
                     pygame.quit()
                     exit()
                 elif ev.type == pygame.KEYDOWN:
                     if ev.key == pygame.K_LEFT:
                         return "voltar"
-                    elif ev.key == pygame.K_RIGHT:
+                    elif ev.key == pygame.K_RIGHT and not num_choices:
                         return "proximo"
+                    elif pygame.K_1 <= ev.key < pygame.K_1 + min(num_choices, 9):
+                        self.selected_choice = ev.key - pygame.K_1
+                        return "escolha"
                     elif ev.key == pygame.K_RETURN:
                         return "mesma"
                     elif ev.key == pygame.K_ESCAPE:
                         return "menu"
-            pygame.time.delay(10)
+                    elif ev.key == pygame.K_UP:
+                        self._pending_events = evs[n + 1:]
+                        return "backlog"
+                elif ev.type == pygame.MOUSEWHEEL and ev.y > 0:
+                    self._pending_events = evs[n + 1:]
+                    return "backlog"
+            playback.delay(10)
+
+    def _open_backlog(self):
+        """
+        Shows the backlog over the current page, then restores the page as it was
+        (without replaying the typewriter).
+        """
+        snapshot = self.screen.copy()
+        pending, self._pending_events = self._pending_events, []
+        BacklogScene(self.screen, self.backlog, self.renderer).run(pending)
+        self.screen.blit(snapshot, (0, 0))
+        playback.flip()
 
     def _update_progress(self):
         """
-        Updates last_page and completed status in progress.pkl.
+        Updates last_page, completed status, variables and history in progress.pkl.
         """
         cap = self.chapter_filename
         self.progress[cap]["last_page"] = self.current_i
-        self.progress[cap]["completed"] = (self.current_i == self.total_pages - 1)
+        self.progress[cap]["completed"] = self.graph.is_end(self.current_i, self.variables)
+        self.progress[cap]["variables"] = dict(self.variables)
+        self.progress[cap]["history"]   = [(i, dict(v)) for i, v in self.history]
         save_progress(self.progress)
 
     def _save_and_return_menu(self):
         """
         Saves progress and returns to menu.
         """
+        self.audio.stop()
         save_progress(self.progress)
         # main.py will call MenuScene after return
@@ -0,0 +1,190 @@
+"""
+Line breaking for the renderer (simplified Unicode UAX #14).
+
+Break opportunities (a new line may start before index i) are:
+  - after a run of spaces (the spaces stay at the end of the previous line and are dropped),
+  - after a zero-width space (U+200B),
+  - before/after CJK ideographs, kana, Hangul and fullwidth forms, except
+    before closing punctuation / small kana / prolonged sound marks (e.g. "。", "」", "ー")
+    and after opening punctuation (e.g. "「", "（").
+They are computed once per distinct text and cached (`break_opportunities`).
+
+Fitting uses per-glyph advance widths (one font.metrics() call per text) and
+prefix sums, so the width of any candidate line is O(1) and the greedy fit is
+linear in the text length. A word wider than the line is broken per character.
+
+Inline color tags ([color=#RRGGBB]…[/]) take no width; if a line break falls
+inside a colored span, the span is closed at the end of the line and reopened
+on the next one, so every wrapped line is valid for the typewriter.
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
+INLINE_COLOR_PATTERN = re.compile(r"\[color=(#[0-9A-Fa-f]{6})\](.*?)\[/\]")
+
+NO_BREAK_BEFORE = set(
+    "!%),.:;?]}¢°·'\"’”"
+    "、。，．：；？！）］｝〕〉》」』】〙〗〟〞｠»"
+    "ゝゞーァィゥェォッャュョヮヵヶぁぃぅぇぉっゃゅょゎゕゖㇰㇱㇲㇳㇴㇵㇶㇷㇸㇹㇺㇻㇼㇽㇾㇿ々〻"
+    "‐゠–〜～…‥・"
+)
+NO_BREAK_AFTER = set(
+    "([{¿¡‘“«$£¥€"
+    "（［｛〔〈《「『【〘〖〝｟"
+)
+ZWSP = "\u200b"
+
+def is_cjk(ch):
+    """
+    True for characters that allow a break on either side (UAX #14 classes ID/H2/H3, roughly).
+    """
+    cp = ord(ch)
+    return (
+        0x2E80 <= cp <= 0x9FFF      # CJK radicals, symbols, kana, ideographs
+        or 0xAC00 <= cp <= 0xD7AF   # Hangul syllables
+        or 0xF900 <= cp <= 0xFAFF   # CJK compatibility ideographs
+        or 0xFF00 <= cp <= 0xFFEF   # fullwidth / halfwidth forms
+        or 0x20000 <= cp <= 0x3FFFF # CJK extensions B+
+    )
+
+@lru_cache(maxsize=1024)
+def break_opportunities(text):
+    """
+    Sorted tuple of indices where a line may start (always ends with len(text)).
+    """
+    breaks = []
+    n = len(text)
+    for i in range(1, n):
+        prev, cur = text[i - 1], text[i]
+        if cur == " ":
+            continue
+        if prev == " " or prev == ZWSP:
+            breaks.append(i)
+        elif (is_cjk(prev) or is_cjk(cur)) and cur not in NO_BREAK_BEFORE and prev not in NO_BREAK_AFTER:
+            breaks.append(i)
+    breaks.append(n)
+    return tuple(breaks)
+
+def split_color_tags(text):
+    """
+    Returns (plain text, [(start, end, "#RRGGBB")]) with spans in plain-text indices.
+    """
+    if "[color=" not in text:
+        return text, []
+    plain, spans, last = [], [], 0
+    pos = 0
+    for m in INLINE_COLOR_PATTERN.finditer(text):
+        s, e = m.span()
+        chunk = text[last:s]
+        plain.append(chunk)
+        pos += len(chunk)
+        inner = m.group(2)
+        spans.append((pos, pos + len(inner), m.group(1)))
+        plain.append(inner)
+        pos += len(inner)
+        last = e
+    plain.append(text[last:])
+    return "".join(plain), spans
+
+def _retag(plain, spans, s, e, si):
+    """
+    plain[s:e] with its color spans re-inserted. `si` is the first span that may overlap;
+    returns (line, new si).
+    """
+    while si < len(spans) and spans[si][1] <= s:
+        si += 1
+    if si >= len(spans) or spans[si][0] >= e:
+        return plain[s:e], si
+    out, pos, j = [], s, si
+    while j < len(spans) and spans[j][0] < e:
+        a, b, col = spans[j]
+        a, b = max(a, s), min(b, e)
+        if a > pos:
+            out.append(plain[pos:a])
+        if b > a:
+            out.append(f"[color={col}]{plain[a:b]}[/]")
+        pos = max(pos, b)
+        j += 1
+    if pos < e:
+        out.append(plain[pos:e])
+    return "".join(out), si
+
+def _line_end(plain, s, b):
+    """
+    End of a line starting at s and broken at b, without its trailing spaces.
+    """
+    while b > s and plain[b - 1] == " ":
+        b -= 1
+    return b
+
+def wrap_text(text, font, max_width):
+    """
+    Breaks text into lines no wider than max_width (in font pixels).
+    `font` needs metrics() (per-glyph advances) and size(), like pygame.font.Font.
+    """
+    plain, spans = split_color_tags(text)
+    n = len(plain)
+    if n == 0:
+        return []
+
+    # Prefix sums of glyph advances: width of plain[a:b] is P[b] - P[a].
+    # metrics() gives None for some glyphs (e.g. everything outside the BMP, or glyphs
+    # the font lacks); measure those alone, once per distinct character
+    P = [0] * (n + 1)
+    total = 0
+    missing = {}
+    for i, m in enumerate(font.metrics(plain)):
+        if m:
+            total += m[4]
+        else:
+            ch = plain[i]
+            w  = missing.get(ch)
+            if w is None:
+                w = missing[ch] = font.size(ch)[0]
+            total += w
+        P[i + 1] = total
+
+    breaks = break_opportunities(plain)
+    lines  = []
+    s, bi, si = 0, 0, 0
+    while s < n:
+        while bi < len(breaks) and breaks[bi] <= s:
+            bi += 1
+
+        # Furthest break whose line (trailing spaces dropped) still fits
+        best_j = None
+        j = bi
+        while j < len(breaks):
+            if P[_line_end(plain, s, breaks[j])] - P[s] > max_width:
+                break
+            best_j = j
+            j += 1
+
+        # Glyph advances can differ from a whole-string render (rounding, missing glyphs):
+        # check the candidate and, if it's too wide, binary search the breaks before it
+        if best_j is not None and font.size(plain[s:_line_end(plain, s, breaks[best_j])])[0] > max_width:
+            lo, hi, best_j = bi, best_j - 1, None
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                if font.size(plain[s:_line_end(plain, s, breaks[mid])])[0] <= max_width:
+                    best_j, lo = mid, mid + 1
+                else:
+                    hi = mid - 1
+
+        if best_j is not None:
+            best_b = breaks[best_j]
+            best_e = _line_end(plain, s, best_b)
+        else:
+            # Nothing fits: break the word per character (at least one per line)
+            best_e = max(s + 1, bisect_right(P, P[s] + max_width, s) - 1)
+            best_b = best_e
+
+        if best_e > s:
+            line, si = _retag(plain, spans, s, best_e, si)
+            lines.append(line)
+        s = best_b
+        while s < n and plain[s] == " ":
+            s += 1
+    return lines
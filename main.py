@@ -1,24 +1,84 @@
-# main.py
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
 import pygame
+import audio
+import playback
+import save_manager
+import search_index
 from menu_scene import MenuScene
 from game_scene import GameScene
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT
 
-def main():
+def parse_args(argv):
+    ap = argparse.ArgumentParser(description="MinimalPyVN")
+    ap.add_argument("--record", metavar="FILE",
+                    help="record key events and timing of this session to FILE")
+    ap.add_argument("--replay", metavar="FILE",
+                    help="replay a recorded session headlessly at full speed and print metrics")
+    ap.add_argument("--metrics", metavar="FILE",
+                    help="with --replay: also write the metrics as JSON to FILE")
+    return ap.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    tmp_dir = None
+
+    if args.replay:
+        # Replays run without a window or sound device (must be set before pygame.init);
+        # the dummy audio driver still reports clip lengths, so voice pacing is the same.
+        # A session recorded without audio is replayed without it (text_speed pacing).
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        source = playback.install(playback.ReplayInput(args.replay))
+        audio.set_enabled(source.audio)
+        # Start from the save data of the recording, without touching the player's files;
+        # the search index is rebuilt in the temp dir too, so every replay pays the same cost
+        tmp_dir = tempfile.mkdtemp()
+        save_manager.set_save_file(os.path.join(tmp_dir, "progress.pkl"))
+        search_index.set_index_file(os.path.join(tmp_dir, "search_index.pkl"))
+        save_manager.save_progress(source.progress)
+    elif not args.record:
+        source = playback.install(playback.LiveInput())
+
     pygame.init()
+    if args.record and not args.replay:
+        # Created after pygame.init so the header can tell whether audio works
+        source = playback.install(playback.RecordingInput(
+            args.record, save_manager.load_progress(), audio=audio.available()))
     screen = pygame.display.set_mode(
         (SCREEN_WIDTH, SCREEN_HEIGHT),
         pygame.RESIZABLE
     )
     pygame.display.set_caption("Title goes here uwu")
 
+    try:
+        run(screen)
+    except (playback.ReplayFinished, SystemExit):
+        if not args.replay:
+            raise
+    finally:
+        source.close()
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    metrics = source.metrics()
+    print(json.dumps(metrics, indent=2))
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            json.dump(metrics, f, indent=2)
+
+def run(screen):
     while True:
         # 1) Main menu screen
         menu = MenuScene(screen)
         chosen = menu.run()  # returns string "chapter_name.yml"
 
-        # 2) Upon selection, enter GameScene
-        game = GameScene(screen, chosen)
+        # 2) Upon selection, enter GameScene (at the matching section if chosen from search)
+        game = GameScene(screen, chosen, start_section=menu.selected_section)
         game.run()
         # When game.run() finishes, return to menu
 
@@ -1,34 +1,46 @@
 import os
-import glob
 import pygame
 import yaml
+import playback
 
 from settings import SCREEN_WIDTH, SCREEN_HEIGHT, CHAPTERS_DIR
 from game_scene import GameScene
 from save_manager import load_progress
+from search_index import open_index
+from chapter_archive import open_archive, list_chapters
 
 class MenuScene:
     """
-    Displays a list of available chapters in CHAPTERS_DIR.
-    For each .yml file, loads the 'title' field from the YAML.
+    Displays a list of available chapters in CHAPTERS_DIR and the chapter archive.
+    For each loose .yml file, loads the 'title' field from the YAML;
+    archived chapters take their title from the archive index (no parsing).
     Sorts alphabetically by filename.
     Shows numbered (1. Chapter Title), coloring completed chapters (progress.pkl) in light blue.
     Navigate with ↑ ↓ and, when ENTER is pressed, returns the selected filename.
+
+    Typing any text switches to search mode: results from the full-text index
+    (block content + speaker names) update on every keystroke. ENTER on a result
+    returns its chapter filename and sets `self.selected_section` to the matching
+    section id, so GameScene can open directly at that page. ESC leaves search mode.
     """
 
+    MAX_RESULTS = 200
+
     def __init__(self, screen):
         self.screen = screen
-        self.clock  = pygame.time.Clock()
         self.font   = pygame.font.SysFont("consolas", 24)
 
-        # 1) Lists all .yml files in the chapters folder (alphabetically)
-        self.items = [os.path.basename(f) for f in glob.glob(os.path.join(CHAPTERS_DIR, "*.yml"))]
-        self.items.sort()  # sort by filename
+        # 1) Lists all chapters: archive + loose .yml files (alphabetically by filename)
+        archive    = open_archive()
+        self.items = list_chapters(CHAPTERS_DIR, archive)
 
-        # 2) For each filename, tries to read the YAML and extract 'title'
+        # 2) For each filename, gets the title (loose files override the archive)
         self.titles = {}
         for filename in self.items:
             path = os.path.join(CHAPTERS_DIR, filename)
+            if archive is not None and filename in archive and not os.path.exists(path):
+                self.titles[filename] = archive.title(filename)
+                continue
             try:
                 with open(path, 'r', encoding='utf-8') as f:
                     data = yaml.safe_load(f)
@@ -37,18 +49,48 @@ class MenuScene:
                 title = os.path.splitext(filename)[0]
             self.titles[filename] = title
 
-        self.selected_index = 0
+        self.selected_index   = 0
+        self.selected_section = None  # set when a search result is chosen
+
+        # 3) Full-text search index (kept in memory between menus; only new/changed chapters are re-parsed)
+        self.search_index   = open_index()
+        self.search_index.refresh(CHAPTERS_DIR, archive)
+        self.search_query   = ""
+        self.search_results = []
+        self.search_mode    = False
+        self.result_index   = 0
 
-        # 3) Loads saved progress (to color completed chapters)
+        # 4) Loads saved progress (to color completed chapters)
         self.progress = load_progress()
 
     def run(self):
         while True:
-            for ev in pygame.event.get():
+            for ev in playback.events():
                 if ev.type == pygame.QUIT:
                     pygame.quit()
                     exit()
 
+                elif ev.type == pygame.TEXTINPUT:
+                    # Typing starts (or continues) a search
+                    self.search_mode = True
+                    self._set_query(self.search_query + ev.text)
+
+                elif ev.type == pygame.KEYDOWN and self.search_mode:
+                    if ev.key == pygame.K_UP:
+                        self.result_index = max(0, self.result_index - 1)
+                    elif ev.key == pygame.K_DOWN:
+                        self.result_index = min(len(self.search_results) - 1, self.result_index + 1)
+                    elif ev.key == pygame.K_BACKSPACE:
+                        self._set_query(self.search_query[:-1])
+                    elif ev.key == pygame.K_RETURN:
+                        if self.search_results:
+                            entry = self.search_results[self.result_index]
+                            self.selected_section = entry.section_id
+                            return entry.chapter
+                    elif ev.key == pygame.K_ESCAPE:
+                        self.search_mode = False
+                        self._set_query("")
+
                 elif ev.type == pygame.KEYDOWN:
                     if ev.key == pygame.K_UP:
                         self.selected_index = max(0, self.selected_index - 1)
@@ -56,6 +98,7 @@ class MenuScene:
                         self.selected_index = min(len(self.items) - 1, self.selected_index + 1)
                     elif ev.key == pygame.K_RETURN:
                         escolhido = self.items[self.selected_index]
+                        self.selected_section = None
                         return escolhido
                     elif ev.key == pygame.K_ESCAPE:
                         pygame.quit()
@@ -64,43 +107,91 @@ class MenuScene:
             # Draw background
             self.screen.fill((30, 30, 30))
 
-            # Draw menu title
-            title_surf = self.font.render("Chapter select", True, (255, 255, 255))
-            title_rect = title_surf.get_rect(center=(SCREEN_WIDTH // 2, 60))
-            self.screen.blit(title_surf, title_rect)
-
-            # Draw each numbered item: "1. Chapter Title"
-            y = 140
-            for idx, filename in enumerate(self.items):
-                # Title from YAML
-                title = self.titles.get(filename, os.path.splitext(filename)[0])
-                display_text = f"{idx+1}. {title}"
-
-                # Check if chapter is completed
-                completed = False
-                if filename in self.progress and self.progress[filename].get("completed", False):
-                    completed = True
-
-                # Color: orange if selected; light blue if completed; white otherwise
-                if idx == self.selected_index:
-                    color = (255, 180, 80)       # orange
-                elif completed:
-                    color = (150, 200, 255)      # light blue
-                else:
-                    color = (255, 255, 255)      # white
-
-                text_surf = self.font.render(display_text, True, color)
-                text_rect = text_surf.get_rect(midleft=(100, y))
-                self.screen.blit(text_surf, text_rect)
-                y += 40
-
-            # Footer instruction
-            instr = "Use ↑ ↓ to navigate | ENTER to choose | ESC to exit"
-            instr_surf = self.font.render(instr, True, (180, 180, 180))
-            instr_rect = instr_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40))
-            self.screen.blit(instr_surf, instr_rect)
-
-            pygame.display.flip()
-            self.clock.tick(30)
-
-        return None
\ No newline at end of file
+            if self.search_mode:
+                self._draw_search()
+            else:
+                self._draw_chapter_list()
+
+            playback.flip()
+            playback.tick(30)
+
+        return None
+
+    def _set_query(self, query):
+        self.search_query   = query
+        self.search_results = self.search_index.search(query, limit=self.MAX_RESULTS)
+        self.result_index   = 0
+
+    def _draw_chapter_list(self):
+        # Draw menu title
+        title_surf = self.font.render("Chapter select", True, (255, 255, 255))
+        title_rect = title_surf.get_rect(center=(SCREEN_WIDTH // 2, 60))
+        self.screen.blit(title_surf, title_rect)
+
+        # Draw each numbered item: "1. Chapter Title"
+        y = 140
+        for idx, filename in enumerate(self.items):
+            # Title from YAML
+            title = self.titles.get(filename, os.path.splitext(filename)[0])
+            display_text = f"{idx+1}. {title}"
+
+            # Check if chapter is completed
+            completed = False
+            if filename in self.progress and self.progress[filename].get("completed", False):
+                completed = True
+
+            # Color: orange if selected; light blue if completed; white otherwise
+            if idx == self.selected_index:
+                color = (255, 180, 80)       # orange
+            elif completed:
+                color = (150, 200, 255)      # light blue
+            else:
+                color = (255, 255, 255)      # white
+
+            text_surf = self.font.render(display_text, True, color)
+            text_rect = text_surf.get_rect(midleft=(100, y))
+            self.screen.blit(text_surf, text_rect)
+            y += 40
+
+        # Footer instruction
+        instr = "Use ↑ ↓ to navigate | ENTER to choose | Type to search | ESC to exit"
+        instr_surf = self.font.render(instr, True, (180, 180, 180))
+        instr_rect = instr_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40))
+        self.screen.blit(instr_surf, instr_rect)
+
+    def _draw_search(self):
+        # Query line
+        query_surf = self.font.render(f"Search: {self.search_query}_", True, (255, 255, 255))
+        query_rect = query_surf.get_rect(midleft=(100, 60))
+        self.screen.blit(query_surf, query_rect)
+
+        count = len(self.search_results)
+        info  = f"{count}+ results" if count >= self.MAX_RESULTS else f"{count} results"
+        info_surf = self.font.render(info, True, (180, 180, 180))
+        self.screen.blit(info_surf, info_surf.get_rect(midright=(SCREEN_WIDTH - 100, 60)))
+
+        # Visible window of results, scrolled so the selection stays on screen
+        y         = 140
+        row_h     = 40
+        max_rows  = max(1, (SCREEN_HEIGHT - 80 - y) // row_h)
+        first     = max(0, min(self.result_index - max_rows // 2, count - max_rows))
+        max_chars = 80
+        for idx in range(first, min(count, first + max_rows)):
+            entry = self.search_results[idx]
+            title = self.titles.get(entry.chapter, self.search_index.title_of(entry.chapter))
+            who   = f"[{entry.speaker}] " if entry.speaker else ""
+            text  = f"{title} › {entry.section_id}: {who}{entry.text}"
+            if len(text) > max_chars:
+                text = text[:max_chars - 1] + "…"
+
+            color = (255, 180, 80) if idx == self.result_index else (255, 255, 255)
+            text_surf = self.font.render(text, True, color)
+            text_rect = text_surf.get_rect(midleft=(100, y))
+            self.screen.blit(text_surf, text_rect)
+            y += row_h
+
+        # Footer instruction
+        instr = "Use ↑ ↓ to navigate | ENTER to open | ESC to cancel search"
+        instr_surf = self.font.render(instr, True, (180, 180, 180))
+        instr_rect = instr_surf.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 40))
+        self.screen.blit(instr_surf, instr_rect)
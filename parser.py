@@ -1,5 +1,7 @@
 import os
+import re
 import yaml
+from branching import SectionGraph
 
 class Block:
     """
@@ -18,6 +20,8 @@ class Block:
       - dialogue_color: RGB tuple for dialog background
       - thinking_color: RGB tuple for thought background
       - text_color:     RGB tuple for text
+      - voice:          voice clip path (relative to AUDIO_DIR)
+      - voice_sync:     bool (pace the typewriter to the voice clip)
     """
     def __init__(self, block_type, content, speaker=None, overrides=None):
         self.type      = block_type      # "narrative", "location", "dialog", or "thinking"
@@ -28,12 +32,19 @@ class Block:
 class Section:
     """
     Each YAML section becomes a 'page'. Contains:
-      - id:     section key (e.g., "part1", "cap2", etc.)
-      - blocks: list of parsed Block() objects
+      - id:      section key (e.g., "part1", "cap2", etc.)
+      - blocks:  list of parsed Block() objects
+      - choices: list of (text, target_id, condition or None)   from "? Text -> target [if cond]"
+      - jumps:   list of (target_id, condition or None)         from "-> target [if cond]"
+      - effects: list of (variable, "=" / "+=" / "-=", expr)    from "$ var = expr"
+    Directives are kept as raw strings here; SectionGraph compiles them.
     """
-    def __init__(self, section_id, blocks):
-        self.id     = section_id
-        self.blocks = blocks
+    def __init__(self, section_id, blocks, choices=None, jumps=None, effects=None):
+        self.id      = section_id
+        self.blocks  = blocks
+        self.choices = choices or []
+        self.jumps   = jumps or []
+        self.effects = effects or []
 
 class ContentParser:
     """
@@ -50,6 +61,11 @@ class ContentParser:
         subtitle_color: "#FFFF00"
 
       title: "Chapter Title"
+      variables:                    # OPTIONAL, initial values for branching
+        trust: 0
+        has_key: false
+      music:                        # OPTIONAL, BGM started when a section is shown (null = stop)
+        part1: "bgm/theme.ogg"
       sections:
         part1:
           - "Narrative: Narrative text here."
@@ -61,13 +77,23 @@ class ContentParser:
           - "Narrative: Another part..."
           - "# [Bob] Normal dialog.#"
           - "[dialogue_color=#303030;font_size=18]# [Bob] Special dialog. Like it?#[/]"
+          - "[voice=voice/bob_01.wav]# [Bob] This line is voiced.#[/]"
           - "¥ [Bob] Thought without override.¥"
+          - "$ trust += 1"
+          - "? Trust Bob -> part3 if trust > 0"
+          - "? Leave -> ending"
+          - "-> ending if not has_key"
 
     Parsing rules:
       1. Loads `settings:` (if present) into `self.settings`. Colors must be "#RRGGBB" format.
          If not, IGNORE (use default). "R,G,B" is not accepted.
       2. Gets `title:` into `self.title`.
       3. For each section in `data["sections"]`, processes each string:
+         0) Branching directives (not rendered) are collected on the Section:
+            - "$ name = expr" / "$ name += expr" / "$ name -= expr" → effects (applied on entering the page).
+            - "? Text -> target [if cond]" → choices shown after the page.
+            - "-> target [if cond]"        → jumps taken with → (first true one wins).
+            Lines that don't match these forms exactly are treated as normal text.
          a) If the line STARTS with "[…]" and ends with "[/]", parse internal key=value;… pairs.
             For color keys (dialogue_color, thinking_color, text_color, subtitle_color), expects "#RRGGBB".
             Otherwise, ignore that color override.
@@ -85,11 +111,19 @@ class ContentParser:
          - `self.title`    : string with the title or filename.
          - `self.sections` : dict where each key is `section_id` and value is `Section(section_id, blocks)`.
          - `self.section_ids`: ordered list of section IDs.
+         - `self.variables`: initial variable values (from `variables:`).
+         - `self.music`    : { section_id: BGM path or None } (from `music:`).
+         - `self.graph`    : compiled SectionGraph (jump table, conditions, static analysis).
+           Its warnings (unknown targets, unreachable sections, dead ends…) are printed.
 
     All color values in `self.settings` or `overrides` are always **tuples (R,G,B)**,
     extracted from "#RRGGBB". If not in this format, the color is ignored.
     """
 
+    EFFECT_PATTERN = re.compile(r"^\$\s*([A-Za-z_]\w*)\s*(\+=|-=|=)\s*(.+)$")
+    CHOICE_PATTERN = re.compile(r"^\?\s*(.+?)\s*->\s*(\S+)(?:\s+if\s+(.+))?$")
+    JUMP_PATTERN   = re.compile(r"^->\s*(\S+)(?:\s+if\s+(.+))?$")
+
     def __init__(self, chapter_path):
         if not os.path.exists(chapter_path):
             raise FileNotFoundError(f"Chapter file not found:\n  {chapter_path}")
@@ -99,6 +133,9 @@ class ContentParser:
         self.settings     = {}
         self.sections     = {}
         self.section_ids  = []
+        self.variables    = {}
+        self.music        = {}
+        self.graph        = None
 
         self._parse_file()
 
@@ -132,18 +169,43 @@ class ContentParser:
         self.title = data.get("title",
                               os.path.splitext(os.path.basename(self.chapter_path))[0])
 
+        # Initial variables for branching (plain YAML scalars)
+        raw_vars = data.get("variables", {})
+        if isinstance(raw_vars, dict):
+            self.variables = {str(k): v for k, v in raw_vars.items()
+                              if isinstance(v, (bool, int, float, str))}
+
+        # Background music per section (path string, or null to stop the music)
+        raw_music = data.get("music", {})
+        if isinstance(raw_music, dict):
+            self.music = {str(k): (v if isinstance(v, str) else None) for k, v in raw_music.items()}
+
         # 3) Process sections in order
         raw_sections = data.get("sections", {})
         for section_id, raw_list in raw_sections.items():
             if not isinstance(raw_list, list):
                 continue
 
-            blocks = []
+            blocks, choices, jumps, effects = [], [], [], []
             for raw_line in raw_list:
                 line_str = raw_line.strip()
                 if not line_str:
                     continue
 
+                # 3.0) Branching directives
+                m = self.EFFECT_PATTERN.match(line_str)
+                if m:
+                    effects.append((m.group(1), m.group(2), m.group(3)))
+                    continue
+                m = self.CHOICE_PATTERN.match(line_str)
+                if m:
+                    choices.append((m.group(1), m.group(2), m.group(3)))
+                    continue
+                m = self.JUMP_PATTERN.match(line_str)
+                if m:
+                    jumps.append((m.group(1), m.group(2)))
+                    continue
+
                 overrides = {}
 
                 # 3a) Detect full-line override: [key=value;…]…[/]
@@ -160,7 +222,7 @@ class ContentParser:
                             k = k.strip()
                             v = v.strip()
 
-                            if k == "skip_enabled":
+                            if k in ("skip_enabled", "voice_sync"):
                                 overrides[k] = (v.lower() == "true")
                             elif k == "font_size":
                                 try:
@@ -224,5 +286,10 @@ class ContentParser:
                 # Any other line → narrative
                 blocks.append(Block("narrative", line_str, overrides=overrides))
 
-            self.sections[section_id] = Section(section_id, blocks)
+            self.sections[section_id] = Section(section_id, blocks, choices, jumps, effects)
             self.section_ids.append(section_id)
+
+        # 4) Compile branching into the section graph (+ static checks)
+        self.graph = SectionGraph(self.section_ids, self.sections, self.variables)
+        for warning in self.graph.warnings:
+            print(f"[parser] {os.path.basename(self.chapter_path)}: {warning}")
@@ -0,0 +1,280 @@
+"""
+Clock & input abstraction used by every scene instead of calling
+pygame.event / pygame.time / time.time / pygame.display.flip directly.
+
+Sources (install one with `playback.install(...)` before the scenes run):
+  - LiveInput:      real events and real time (default).
+  - RecordingInput: real events; writes every input event to a file, tagged with
+                    the number of the event poll that returned it. Time seen by the
+                    game advances only through waits (tick/sleep/delay), so the flow
+                    depends on the inputs alone.
+  - ReplayInput:    feeds a recording back at the same polls with a virtual clock
+                    (waits return immediately), for headless, full-speed runs.
+
+Recording file (JSON lines):
+  {"version": 1, "progress": {...}, "audio": true}
+                                             header: save data at the start and whether
+                                             audio worked (it changes voice pacing)
+  {"poll": 12, "events": [{"type": 768, "key": 1073741903, ...}]}
+  {"end": 345}                               poll count when the session ended
+
+Every source collects metrics (see `metrics()`): wall/virtual seconds, flips,
+polls, events and frame times (wall time between flips).
+"""
+
+import json
+import time
+import pygame
+
+RECORDED_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT, pygame.MOUSEWHEEL)
+SLOW_FRAME_MS   = 1000.0 / 60
+
+class ReplayFinished(Exception):
+    """
+    Raised by ReplayInput when the game polls past the end of the recording.
+    """
+
+class LiveInput:
+    """
+    Real events and real time.
+    """
+
+    def __init__(self):
+        self._clock      = pygame.time.Clock()
+        self._started    = time.perf_counter()
+        self._last_flip  = self._started
+        self.polls       = 0
+        self.events_seen = 0
+        self.flips       = 0
+        self.frame_total = 0.0
+        self.frame_max   = 0.0
+        self.slow_frames = 0
+
+    # ---------- events ----------
+
+    def events(self):
+        evs = pygame.event.get()
+        self.polls += 1
+        self.events_seen += len(evs)
+        return evs
+
+    def clear(self):
+        pygame.event.clear()
+
+    def pump(self):
+        pygame.event.pump()
+
+    def keys_held(self):
+        return any(pygame.key.get_pressed())
+
+    # ---------- time ----------
+
+    def now(self):
+        return time.time()
+
+    def tick(self, fps):
+        self._clock.tick(fps)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def delay(self, ms):
+        pygame.time.delay(ms)
+
+    # ---------- display ----------
+
+    def flip(self):
+        pygame.display.flip()
+        t  = time.perf_counter()
+        ms = (t - self._last_flip) * 1000.0
+        self._last_flip = t
+        self.flips += 1
+        self.frame_total += ms
+        if ms > self.frame_max:
+            self.frame_max = ms
+        if ms > SLOW_FRAME_MS:
+            self.slow_frames += 1
+
+    def metrics(self):
+        return {
+            "wall_seconds":    round(time.perf_counter() - self._started, 4),
+            "virtual_seconds": round(self.virtual_seconds(), 4),
+            "polls":           self.polls,
+            "events":          self.events_seen,
+            "flips":           self.flips,
+            "frame_ms_avg":    round(self.frame_total / self.flips, 4) if self.flips else 0.0,
+            "frame_ms_max":    round(self.frame_max, 4),
+            "slow_frames":     self.slow_frames,
+        }
+
+    def virtual_seconds(self):
+        return time.perf_counter() - self._started
+
+    def close(self):
+        pass
+
+class RecordingInput(LiveInput):
+    """
+    Live input that writes every input event to `path` (see module docstring).
+    `progress` is the save data at the start, stored so the replay begins from the same state;
+    `audio` tells whether sound was available, so the replay paces voice lines the same way.
+    """
+
+    def __init__(self, path, progress=None, audio=True):
+        super().__init__()
+        self._now  = 0.0
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps({"version": 1, "progress": progress or {},
+                                     "audio": bool(audio)}) + "\n")
+
+    def events(self):
+        evs = pygame.event.get()
+        recorded = [_event_to_dict(ev) for ev in evs if ev.type in RECORDED_EVENTS]
+        if recorded:
+            self._file.write(json.dumps({"poll": self.polls, "events": recorded}) + "\n")
+            self._file.flush()
+        self.polls += 1
+        self.events_seen += len(recorded)
+        return evs
+
+    def now(self):
+        return self._now
+
+    def tick(self, fps):
+        self._clock.tick(fps)
+        self._now += 1.0 / fps
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+        self._now += seconds
+
+    def delay(self, ms):
+        pygame.time.delay(ms)
+        self._now += ms / 1000.0
+
+    def virtual_seconds(self):
+        return self._now
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write(json.dumps({"end": self.polls}) + "\n")
+            self._file.close()
+
+class ReplayInput(LiveInput):
+    """
+    Plays back a recording: same events at the same polls, virtual clock, no real waiting.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self._now     = 0.0
+        self._by_poll = {}
+        self.progress = {}
+        self.audio    = True  # recordings made before the flag existed assumed audio
+        self.end_poll = None
+
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                rec = json.loads(line)
+                if "version" in rec:
+                    self.progress = rec.get("progress", {})
+                    self.audio    = rec.get("audio", True)
+                elif "poll" in rec:
+                    self._by_poll[rec["poll"]] = rec["events"]
+                elif "end" in rec:
+                    self.end_poll = rec["end"]
+
+        # Truncated recording (e.g. the game crashed): stop after the last event
+        if self.end_poll is None:
+            self.end_poll = max(self._by_poll, default=-1) + 1
+
+    def events(self):
+        if self.polls >= self.end_poll:
+            raise ReplayFinished()
+        evs = [_event_from_dict(d) for d in self._by_poll.get(self.polls, ())]
+        self.polls += 1
+        self.events_seen += len(evs)
+        # Keep the (dummy) window responsive; real events are ignored
+        pygame.event.pump()
+        return evs
+
+    def clear(self):
+        pygame.event.clear()
+
+    def keys_held(self):
+        return False
+
+    def now(self):
+        return self._now
+
+    def tick(self, fps):
+        self._now += 1.0 / fps
+
+    def sleep(self, seconds):
+        self._now += seconds
+
+    def delay(self, ms):
+        self._now += ms / 1000.0
+
+    def virtual_seconds(self):
+        return self._now
+
+def _event_to_dict(ev):
+    data = {"type": ev.type}
+    for k, v in ev.dict.items():
+        if isinstance(v, (bool, int, float, str)):
+            data[k] = v
+    return data
+
+def _event_from_dict(data):
+    attrs = dict(data)
+    ev_type = attrs.pop("type")
+    return pygame.event.Event(ev_type, attrs)
+
+# ---------- current source (module-level API used by the scenes) ----------
+
+_source = None
+
+def install(source):
+    """
+    Makes `source` the clock/input used by all scenes. Returns it.
+    """
+    global _source
+    _source = source
+    return _source
+
+def current():
+    global _source
+    if _source is None:
+        _source = LiveInput()
+    return _source
+
+def events():
+    return current().events()
+
+def clear_events():
+    current().clear()
+
+def pump():
+    current().pump()
+
+def keys_held():
+    return current().keys_held()
+
+def now():
+    return current().now()
+
+def tick(fps):
+    current().tick(fps)
+
+def sleep(seconds):
+    current().sleep(seconds)
+
+def delay(ms):
+    current().delay(ms)
+
+def flip():
+    current().flip()
@@ -1,7 +1,82 @@
 import pygame
-import time
-import re
-from settings import SCREEN_WIDTH, SCREEN_HEIGHT
+import playback
+import linebreak
+from settings import SCREEN_WIDTH, SCREEN_HEIGHT, FONT_BACKEND, FONT_KERNING
+
+try:
+    import pygame.freetype as freetype
+except ImportError:  # pygame built without freetype
+    freetype = None
+
+FONT_NAME = "consolas"
+
+class FreetypeFont:
+    """
+    pygame.freetype font at a fixed size/style, exposing the parts of the
+    pygame.font.Font API the renderer uses for layout (size, get_linesize, metrics)
+    plus render_to(), which draws straight into the target surface (no temporary Surface).
+      - One underlying freetype.Font is shared by every size/style; italic and
+        bold are style flags instead of separate SysFont objects.
+      - Layout is measured with the same face, size and style that render_to draws
+        with (measuring creates no surfaces), so the width of drawn text is exactly
+        the width used to place colored segments and size boxes.
+    """
+
+    def __init__(self, base, size, italic=False, bold=False):
+        self.base     = base
+        self.px       = size
+        self.style    = freetype.STYLE_NORMAL
+        if italic:
+            self.style |= freetype.STYLE_OBLIQUE
+        if bold:
+            self.style |= freetype.STYLE_STRONG
+        self.ascender = base.get_sized_ascender(size)
+        self.height   = base.get_sized_height(size)
+
+    def get_linesize(self):
+        return self.height
+
+    def size(self, text):
+        if not text:
+            return (0, self.height)
+        return (self.base.get_rect(text, style=self.style, size=self.px).width, self.height)
+
+    def metrics(self, text):
+        return self.base.get_metrics(text, size=self.px)
+
+    def render_to(self, surface, pos, text, color):
+        if text:
+            # origin=True: pos is the baseline, so move down by the ascent
+            self.base.render_to(surface, (pos[0], pos[1] + self.ascender), text, color,
+                                style=self.style, size=self.px)
+
+class VoicePacer:
+    """
+    Reveal schedule of a block synced to its voice clip: `chars` characters spread
+    evenly over `length` seconds from the clip's start, so several may appear in one
+    frame and the last one appears when the clip ends.
+    """
+
+    def __init__(self, start, length, chars):
+        self.start  = start
+        self.length = length
+        self.chars  = chars
+        self.shown  = 0
+
+    def due(self):
+        elapsed = playback.now() - self.start
+        return min(self.chars, int(elapsed * self.chars / self.length + 1e-9))
+
+    def ready(self):
+        return self.due() > self.shown
+
+    def take(self, limit):
+        """
+        Marks the characters due so far as shown (at most `limit`) and returns how many.
+        """
+        n = max(1, min(limit, self.due() - self.shown))
+        self.shown += n
+        return n
 
 class TextRenderer:
     """
@@ -9,16 +84,44 @@ class TextRenderer:
       - Centered title at the top.
       - All blocks (narration, location, dialog, thought) accumulated on a page.
       - Typewriter effect, character by character, supporting inline color overrides: [color=#RRGGBB]text[/].
-      - Word-wrap for narrative and dialog/thought (boxes grow to fit).
+      - Word-wrap for narrative and dialog/thought (boxes grow to fit), with CJK /
+        no-space line breaking (see linebreak.py); wrapped lines are cached per renderer.
       - Dialog/thought boxes with dynamic height.
       - Footer with “End →” if last page and “Page X/Y (Last)” indicator.
+      - Numbered choice box above the footer for branching pages (draw_choices).
+      - Voice lines (block override `voice=file.wav`) through an AudioManager: the clip
+        starts with its block and, with `voice_sync` (default true), the typewriter
+        paces the block to the clip's length. The next block's clip is preloaded.
+
+    Font backend (FONT_BACKEND in settings.py):
+      - "font":     pygame.font; each draw renders a temporary Surface and blits it.
+      - "freetype": pygame.freetype; text is drawn directly into the screen with
+                    render_to (optional kerning via FONT_KERNING).
+    Fonts are cached per (size, italic, bold), so blocks don't create new fonts.
     """
 
-    INLINE_COLOR_PATTERN = re.compile(r"\[color=(#[0-9A-Fa-f]{6})\](.*?)\[/\]")
+    INLINE_COLOR_PATTERN = linebreak.INLINE_COLOR_PATTERN
+    WRAP_CACHE_SIZE      = 4096
 
-    def __init__(self, screen, settings):
+    def __init__(self, screen, settings, audio=None):
         pygame.font.init()
         self.screen = screen
+        self.audio  = audio
+
+        # Font backend (falls back to pygame.font if freetype isn't available)
+        self._fonts        = {}
+        self._ft_base      = None
+        self._ft_scale     = 1.0
+        self._wrap_cache   = {}
+        if FONT_BACKEND == "freetype" and freetype is not None:
+            freetype.init()
+            path = pygame.font.match_font(FONT_NAME)
+            if path is None:
+                # Same fallback file as pygame.font, shrunk by the same 0.6875
+                self._ft_scale = 0.6875
+            self._ft_base = freetype.Font(path, 0)
+            self._ft_base.origin  = True
+            self._ft_base.kerning = FONT_KERNING
 
         # Global settings (from parser.py)
         self.text_speed            = settings.get("text_speed",    0.03)
@@ -28,40 +131,61 @@ class TextRenderer:
         self.font_size_default     = settings.get("font_size",    20)
         self.text_color_default    = settings.get("text_color",   (255,255,255))
         self.subtitle_color_default= settings.get("subtitle_color",(255,255,  0))
+        self.voice_sync            = settings.get("voice_sync",   True)
 
         # Default fonts & metrics
-        self.font               = pygame.font.SysFont("consolas", self.font_size_default)
-        self.italic_font        = pygame.font.SysFont("consolas", self.font_size_default, italic=True)
+        self.font               = self.get_font(self.font_size_default)
+        self.italic_font        = self.get_font(self.font_size_default, italic=True)
         self.line_height        = self.font.get_linesize()
         self.margin_x           = 20
         self.title_area_height  = self.line_height + 10
         self.text_area_width    = SCREEN_WIDTH - 2 * self.margin_x
         self.block_spacing      = 20
 
+    def get_font(self, size, italic=False, bold=False):
+        """
+        Returns a cached font for the current backend.
+        """
+        key  = (size, italic, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            if self._ft_base is not None:
+                font = FreetypeFont(self._ft_base, int(size * self._ft_scale), italic=italic, bold=bold)
+            else:
+                font = pygame.font.SysFont(FONT_NAME, size, bold=bold, italic=italic)
+            self._fonts[key] = font
+        return font
+
+    def blit_text(self, font, text, pos, color):
+        """
+        Draws text at pos (top-left). The freetype backend renders straight into the screen.
+        """
+        if isinstance(font, FreetypeFont):
+            font.render_to(self.screen, pos, text, color)
+        else:
+            self.screen.blit(font.render(text, True, color), pos)
+
     def _wrap_text(self, text, font, max_width):
         """
         Breaks text into lines so each line fits within max_width.
+        Results are cached, since pages are re-wrapped on every redraw (backlog, page turns).
         """
-        words, lines, cur = text.split(" "), [], ""
-        for w in words:
-            test = cur + ("" if cur=="" else " ") + w
-            if font.size(test)[0] <= max_width:
-                cur = test
-            else:
-                if cur:
-                    lines.append(cur)
-                cur = w
-        if cur:
-            lines.append(cur)
-        return lines
+        key   = (text, font, max_width)
+        lines = self._wrap_cache.get(key)
+        if lines is None:
+            if len(self._wrap_cache) >= self.WRAP_CACHE_SIZE:
+                self._wrap_cache.clear()
+            lines = linebreak.wrap_text(text, font, max_width)
+            self._wrap_cache[key] = lines
+        return list(lines)
 
     def render_section(self, blocks, title, current_page, total_pages):
         # 1) Clear pending keys
-        pygame.event.clear()
-        pygame.event.pump()
-        while any(pygame.key.get_pressed()):
-            pygame.event.pump()
-            pygame.time.delay(10)
+        playback.clear_events()
+        playback.pump()
+        while playback.keys_held():
+            playback.pump()
+            playback.delay(10)
 
         is_last = (current_page == total_pages)
 
@@ -70,31 +194,40 @@ class TextRenderer:
         self._draw_title(title)
         self._draw_footer(is_last)
         self._draw_page_indicator(current_page, total_pages)
-        pygame.display.flip()
+        playback.flip()
 
         # Initial Y position
         y = self.title_area_height + self.block_spacing
 
         # 3) Render each block
-        for blk in blocks:
+        for idx, blk in enumerate(blocks):
             overrides = blk.overrides or {}
             font_size = overrides.get("font_size", self.font_size_default)
-            font      = pygame.font.SysFont("consolas", font_size)
+            font      = self.get_font(font_size)
             text_color= overrides.get("color", self.text_color_default)
             speed     = overrides.get("text_speed", self.text_speed)
             skip_ok   = overrides.get("skip_enabled", self.skip_enabled)
 
+            # Voice: start the clip, pace the typewriter to it, preload the next block's clip
+            voice = None
+            if self.audio is not None:
+                length = self.audio.play_voice(overrides.get("voice"))
+                if length and blk.type != "location" and overrides.get("voice_sync", self.voice_sync):
+                    voice = (playback.now(), length)
+                if idx + 1 < len(blocks):
+                    self.audio.preload_voice((blocks[idx + 1].overrides or {}).get("voice"))
+
             if blk.type == "location":
                 col = overrides.get("subtitle_color", self.subtitle_color_default)
-                surf = font.render(blk.content, True, col)
-                self.screen.blit(surf, (self.margin_x, y))
-                pygame.display.flip()
-                time.sleep(0.5)
+                self.blit_text(font, blk.content, (self.margin_x, y), col)
+                playback.flip()
+                playback.sleep(0.5)
                 y += self.line_height + self.block_spacing
 
             elif blk.type == "narrative":
                 # word-wrap narrative
                 lines = self._wrap_text(blk.content, font, self.text_area_width)
+                pacer = self._voice_pacer(voice, lines)
                 for line in lines:
                     y = self._typewriter_line(
                         line,
@@ -103,7 +236,8 @@ class TextRenderer:
                         color=text_color,
                         font=font,
                         text_speed=speed,
-                        skip_enabled=skip_ok
+                        skip_enabled=skip_ok,
+                        pacer=pacer
                     )
                 y += self.block_spacing
 
@@ -114,12 +248,13 @@ class TextRenderer:
                     sp_font = font
                 else:
                     bg      = overrides.get("thinking_color", self.thinking_bg_default)
-                    sp_font = pygame.font.SysFont("consolas", font_size, italic=True)
+                    sp_font = self.get_font(font_size, italic=True)
 
                 # wrap and compute dynamic box size
                 box_w   = int(self.text_area_width * 0.7)
                 wrapped = self._wrap_text(blk.content, sp_font, box_w - 20)
                 box_h   = (1 + len(wrapped)) * self.line_height + 20
+                pacer   = self._voice_pacer(voice, wrapped)
                 box_x   = (SCREEN_WIDTH - box_w) // 2
                 box_y   = y - 10
 
@@ -131,9 +266,8 @@ class TextRenderer:
                 # speaker line
                 if blk.speaker:
                     spc = (255,255,0) if blk.type=="dialog" else (255,255,255)
-                    sp_surf = sp_font.render(f"[{blk.speaker}]", True, spc)
-                    self.screen.blit(sp_surf, (box_x + 10, box_y + 10))
-                    pygame.display.flip()
+                    self.blit_text(sp_font, f"[{blk.speaker}]", (box_x + 10, box_y + 10), spc)
+                    playback.flip()
 
                 # render each wrapped line inside box
                 line_y = box_y + 10 + self.line_height + 5
@@ -150,7 +284,8 @@ class TextRenderer:
                         box_h=box_h,
                         bg_color=bg,
                         text_speed=speed,
-                        skip_enabled=skip_ok
+                        skip_enabled=skip_ok,
+                        pacer=pacer
                     )
                 y = box_y + box_h + self.block_spacing
 
@@ -158,14 +293,36 @@ class TextRenderer:
             self._draw_title(title)
             self._draw_footer(is_last)
             self._draw_page_indicator(current_page, total_pages)
-            pygame.display.flip()
+            playback.flip()
 
         # 4) Page complete; return to navigation loop
-        pygame.display.flip()
+        playback.flip()
+
+    def _typewriter_wait(self, done, skip_enabled):
+        """
+        Polls events at 60 fps until done() is true. Returns True if a key asked to skip.
+        """
+        accelerate = False
+        while not done():
+            for ev in playback.events():
+                if ev.type == pygame.KEYDOWN and skip_enabled:
+                    accelerate = True
+            playback.tick(60)
+        return accelerate
 
-    def _typewriter_line(self, text, x, y, color, font, text_speed, skip_enabled):
+    def _voice_pacer(self, voice, lines):
+        """
+        VoicePacer for a synced block (`voice` = (clip start, clip length)), or None.
+        """
+        if voice is None:
+            return None
+        chars = sum(len(self.INLINE_COLOR_PATTERN.sub(r"\2", line)) for line in lines)
+        return VoicePacer(voice[0], voice[1], chars) if chars else None
+
+    def _typewriter_line(self, text, x, y, color, font, text_speed, skip_enabled, pacer=None):
         """
         Single-line typewriter with inline-color support.
+        With a VoicePacer, characters follow the voice clip instead of text_speed.
         """
         segments = []
         last_end = 0
@@ -182,43 +339,43 @@ class TextRenderer:
         if last_end < len(text):
             segments.append((color, text[last_end:]))
 
-        clock = pygame.time.Clock()
         cx = x
         for seg_color, seg_text in segments:
             idx = 0
             accelerate = False
             while idx < len(seg_text):
+                if pacer is not None and not accelerate:
+                    accelerate = self._typewriter_wait(pacer.ready, skip_enabled)
                 if accelerate:
+                    if pacer is not None:
+                        pacer.shown += len(seg_text) - idx
                     disp = seg_text
                 else:
-                    idx += 1
+                    idx += 1 if pacer is None else pacer.take(len(seg_text) - idx)
                     disp = seg_text[:idx]
                 rect_bg = pygame.Rect(cx, y, self.text_area_width, self.line_height)
                 pygame.draw.rect(self.screen, (0,0,0), rect_bg)
-                surf = font.render(disp, True, seg_color)
-                self.screen.blit(surf, (cx, y))
-                pygame.display.flip()
-
-                if not accelerate:
-                    start = time.time()
-                    while time.time() - start < text_speed:
-                        for ev in pygame.event.get():
-                            if ev.type == pygame.KEYDOWN and skip_enabled:
-                                accelerate = True
-                        clock.tick(60)
-                else:
+                self.blit_text(font, disp, (cx, y), seg_color)
+                playback.flip()
+
+                if accelerate:
                     break
+                if pacer is None:
+                    start = playback.now()
+                    accelerate = self._typewriter_wait(
+                        lambda: playback.now() - start >= text_speed, skip_enabled)
             cx += font.size(seg_text)[0]
         return y + self.line_height
 
     def _typewriter_in_box(
         self, text, x, y, color, font,
         box_x, box_y, box_w, box_h, bg_color,
-        text_speed, skip_enabled
+        text_speed, skip_enabled, pacer=None
     ):
         """
         Typewriter inside a box, preserving borders & inline-color.
         Clears only the wclean width so colored segments don’t leak.
+        With a VoicePacer, characters follow the voice clip instead of text_speed.
         """
         segments = []
         last_end = 0
@@ -235,58 +392,75 @@ class TextRenderer:
         if last_end < len(text):
             segments.append((color, text[last_end:]))
 
-        clock = pygame.time.Clock()
         cx = x
         for seg_color, seg_text in segments:
             idx = 0
             accelerate = False
             while idx < len(seg_text):
+                if pacer is not None and not accelerate:
+                    accelerate = self._typewriter_wait(pacer.ready, skip_enabled)
                 if accelerate:
+                    if pacer is not None:
+                        pacer.shown += len(seg_text) - idx
                     disp = seg_text
                 else:
-                    idx += 1
+                    idx += 1 if pacer is None else pacer.take(len(seg_text) - idx)
                     disp = seg_text[:idx]
                 wclean = font.size(disp)[0]
                 pygame.draw.rect(self.screen, bg_color, (cx, y, wclean, self.line_height))
-                surf = font.render(disp, True, seg_color)
-                self.screen.blit(surf, (cx, y))
-                pygame.display.flip()
-
-                if not accelerate:
-                    start = time.time()
-                    while time.time() - start < text_speed:
-                        for ev in pygame.event.get():
-                            if ev.type == pygame.KEYDOWN and skip_enabled:
-                                accelerate = True
-                        clock.tick(60)
-                else:
+                self.blit_text(font, disp, (cx, y), seg_color)
+                playback.flip()
+
+                if accelerate:
                     break
+                if pacer is None:
+                    start = playback.now()
+                    accelerate = self._typewriter_wait(
+                        lambda: playback.now() - start >= text_speed, skip_enabled)
             cx += font.size(seg_text)[0]
         return y + self.line_height
 
     def _draw_title(self, title):
-        surf = self.font.render(title, True, (255,255,255))
-        rect = surf.get_rect(center=(SCREEN_WIDTH//2, self.line_height//2+5))
-        self.screen.blit(surf, rect)
+        w, h = self.font.size(title)
+        rect = pygame.Rect(0, 0, w, h)
+        rect.center = (SCREEN_WIDTH//2, self.line_height//2+5)
+        self.blit_text(self.font, title, rect.topleft, (255,255,255))
 
     def _draw_footer(self, is_last=False):
         if is_last:
-            texto = "← Back     (ENTER repeat)     (ESC Menu)     End →"
+            texto = "← Back     (↑ Backlog)     (ENTER repeat)     (ESC Menu)     End →"
         else:
-            texto = "← Back     (ENTER repeat)     (ESC Menu)     Next →"
-        footer_font = pygame.font.SysFont("consolas", 18)
-        surf = footer_font.render(texto, True, (200,200,200))
-        x = (SCREEN_WIDTH - surf.get_width()) // 2
+            texto = "← Back     (↑ Backlog)     (ENTER repeat)     (ESC Menu)     Next →"
+        footer_font = self.get_font(18)
+        x = (SCREEN_WIDTH - footer_font.size(texto)[0]) // 2
         y = SCREEN_HEIGHT - 30
-        self.screen.blit(surf, (x, y))
+        self.blit_text(footer_font, texto, (x, y), (200,200,200))
 
     def _draw_page_indicator(self, current_page, total_pages):
         if current_page == total_pages:
             texto = f"Page {current_page}/{total_pages} (Last)"
         else:
             texto = f"Page {current_page}/{total_pages}"
-        small_font = pygame.font.SysFont("consolas", 16)
-        surf = small_font.render(texto, True, (180,180,180))
-        x = SCREEN_WIDTH - surf.get_width() - 20
-        y = SCREEN_HEIGHT - 30 - surf.get_height() - 5
-        self.screen.blit(surf, (x, y))
+        small_font = self.get_font(16)
+        w, h = small_font.size(texto)
+        x = SCREEN_WIDTH - w - 20
+        y = SCREEN_HEIGHT - 30 - h - 5
+        self.blit_text(small_font, texto, (x, y), (180,180,180))
+
+    def draw_choices(self, choices):
+        """
+        Draws the visible choices ("1. …", "2. …") in a box above the footer.
+        """
+        choices = choices[:9]
+        box_w = int(self.text_area_width * 0.7)
+        box_h = len(choices) * self.line_height + 20
+        box_x = (SCREEN_WIDTH - box_w) // 2
+        box_y = SCREEN_HEIGHT - 60 - box_h
+        pygame.draw.rect(self.screen, self.dialogue_bg_default, (box_x, box_y, box_w, box_h))
+        pygame.draw.rect(self.screen, (255,180,80), (box_x, box_y, box_w, box_h), 2)
+
+        y = box_y + 10
+        for n, text in enumerate(choices, start=1):
+            self.blit_text(self.font, f"{n}. {text}", (box_x + 10, y), self.text_color_default)
+            y += self.line_height
+        playback.flip()
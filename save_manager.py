@@ -2,13 +2,25 @@ import os
 import pickle
 from settings import SAVE_FILE
 
+def set_save_file(path):
+    """
+    Redirects load/save to another file (e.g., a temporary one during replays).
+    """
+    global SAVE_FILE
+    SAVE_FILE = path
+
 def load_progress():
     """
     Loads progress from SAVE_FILE if it exists and is a valid dict.
     Returns an empty dict otherwise.
     Expected structure:
       {
-        "chapter1.yml": {"last_page": 0, "completed": False},
+        "chapter1.yml": {
+          "last_page": 0,
+          "completed": False,
+          "variables": {"trust": 1},              # chapter variables at last_page
+          "history":   [(0, {"trust": 0}), ...],  # (page index, variables) pages left going forward, for ←
+        },
         ...
       }
     """
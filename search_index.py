@@ -0,0 +1,285 @@
+import os
+import re
+import glob
+import heapq
+import pickle
+from bisect import bisect_left
+from parser import ContentParser
+from chapter_archive import open_archive
+from settings import SEARCH_INDEX_FILE
+
+def set_index_file(path):
+    """
+    Redirects the default index file (e.g., a temporary one during replays).
+    """
+    global SEARCH_INDEX_FILE
+    SEARCH_INDEX_FILE = path
+
+class SearchEntry:
+    """
+    One indexed block. Keeps just enough to show a result line and to
+    open GameScene at the right page:
+      - chapter:       chapter filename (e.g., "chapter1.yml")
+      - section_id:    section key inside the chapter
+      - section_index: position of the section in `section_ids`
+      - block_index:   position of the block inside the section
+      - speaker:       speaker name ("" for narrative/location)
+      - text:          block content without inline color tags
+    """
+    __slots__ = ("chapter", "section_id", "section_index", "block_index", "speaker", "text")
+
+    def __init__(self, chapter, section_id, section_index, block_index, speaker, text):
+        self.chapter       = chapter
+        self.section_id    = section_id
+        self.section_index = section_index
+        self.block_index   = block_index
+        self.speaker       = speaker
+        self.text          = text
+
+    def __getstate__(self):
+        return (self.chapter, self.section_id, self.section_index,
+                self.block_index, self.speaker, self.text)
+
+    def __setstate__(self, state):
+        (self.chapter, self.section_id, self.section_index,
+         self.block_index, self.speaker, self.text) = state
+
+class SearchIndex:
+    """
+    Inverted index over block content and speaker names of every chapter in a folder.
+    Structure (all pickled to `index_path`):
+
+      chapters: { "chapter1.yml": {"stamp": (mtime_ns, size), "title": "...", "docs": [doc ids]} }
+      docs:     { doc_id: SearchEntry(...) }
+      postings: { token: set(doc ids) }
+
+    Usage:
+      index = open_index()              # SEARCH_INDEX_FILE, loaded once per process
+      index.refresh(CHAPTERS_DIR)    # re-parses only new/changed chapters, drops deleted ones
+                                     # (chapters.pak is included; loose files override it)
+      results = index.search("ali hel")
+
+    Query rules:
+      - Text is lowercased and split into word tokens ("\\w+"); inline color tags are ignored.
+      - Every query token must match (AND). The last token is matched as a prefix,
+        so results update while the player is still typing a word.
+    """
+
+    VERSION = 1
+    TOKEN_PATTERN = re.compile(r"\w+")
+    TAG_PATTERN   = re.compile(r"\[color=#[0-9A-Fa-f]{6}\]|\[/\]")
+
+    def __init__(self, index_path=None):
+        self.index_path = index_path or SEARCH_INDEX_FILE
+        self.chapters   = {}
+        self.docs       = {}
+        self.postings   = {}
+        self.next_id    = 0
+        self._vocab     = None  # sorted token list for prefix lookups (rebuilt lazily)
+        self._dirty     = False
+
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self):
+        """
+        Loads the index from disk. Any missing/invalid/outdated file starts an empty index.
+        """
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                data = pickle.load(f)
+        except Exception:
+            return
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return
+        self.chapters = data["chapters"]
+        self.docs     = data["docs"]
+        self.postings = data["postings"]
+        self.next_id  = data["next_id"]
+
+    def save(self):
+        """
+        Writes the index to disk (only if something changed since the last load/save).
+        """
+        if not self._dirty:
+            return
+        data = {
+            "version":  self.VERSION,
+            "chapters": self.chapters,
+            "docs":     self.docs,
+            "postings": self.postings,
+            "next_id":  self.next_id,
+        }
+        try:
+            with open(self.index_path, "wb") as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._dirty = False
+        except Exception as e:
+            print(f"[search_index] Error saving index: {e}")
+
+    # ---------- building ----------
+
+    @classmethod
+    def tokenize(cls, text):
+        text = cls.TAG_PATTERN.sub("", text)
+        return cls.TOKEN_PATTERN.findall(text.lower())
+
+    def refresh(self, chapters_dir, archive=None):
+        """
+        Brings the index up to date with the .yml files in `chapters_dir` and the
+        chapter archive (a loose file wins over an archived chapter with the same name):
+          - new or modified chapters (by mtime/size) are (re)indexed,
+          - chapters that no longer exist are removed.
+        Saves to disk if anything changed.
+        """
+        archive = archive or open_archive()
+        found = {}
+        if archive is not None:
+            for filename in archive.chapters():
+                found[filename] = (None, archive.stamp)
+        for path in glob.glob(os.path.join(chapters_dir, "*.yml")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            found[os.path.basename(path)] = (path, (st.st_mtime_ns, st.st_size))
+
+        for filename in list(self.chapters):
+            if filename not in found:
+                self._remove_chapter(filename)
+
+        for filename, (path, stamp) in found.items():
+            info = self.chapters.get(filename)
+            if info is not None and info["stamp"] == stamp:
+                continue
+            self._remove_chapter(filename)
+            try:
+                parser = ContentParser(path) if path else archive.load_chapter(filename)
+            except Exception:
+                # Broken chapter: remember the stamp so it isn't re-parsed every time
+                self.chapters[filename] = {"stamp": stamp, "title": os.path.splitext(filename)[0], "docs": []}
+                self._dirty = True
+                continue
+            self._add_chapter(filename, stamp, parser)
+
+        self.save()
+
+    def _add_chapter(self, filename, stamp, parser):
+        doc_ids = []
+        for sec_idx, section_id in enumerate(parser.section_ids):
+            for blk_idx, blk in enumerate(parser.sections[section_id].blocks):
+                text = self.TAG_PATTERN.sub("", blk.content)
+                tokens = set(self.tokenize(text))
+                tokens.update(self.tokenize(blk.speaker))
+                if not tokens:
+                    continue
+
+                doc_id = self.next_id
+                self.next_id += 1
+                self.docs[doc_id] = SearchEntry(filename, section_id, sec_idx, blk_idx, blk.speaker, text)
+                for tok in tokens:
+                    posting = self.postings.get(tok)
+                    if posting is None:
+                        self.postings[tok] = {doc_id}
+                        self._vocab = None
+                    else:
+                        posting.add(doc_id)
+                doc_ids.append(doc_id)
+
+        self.chapters[filename] = {"stamp": stamp, "title": parser.title, "docs": doc_ids}
+        self._dirty = True
+
+    def _remove_chapter(self, filename):
+        info = self.chapters.pop(filename, None)
+        if info is None:
+            return
+        for doc_id in info["docs"]:
+            entry = self.docs.pop(doc_id, None)
+            if entry is None:
+                continue
+            tokens = set(self.tokenize(entry.text))
+            tokens.update(self.tokenize(entry.speaker))
+            for tok in tokens:
+                posting = self.postings.get(tok)
+                if posting is None:
+                    continue
+                posting.discard(doc_id)
+                if not posting:
+                    del self.postings[tok]
+                    self._vocab = None
+        self._dirty = True
+
+    # ---------- querying ----------
+
+    def title_of(self, filename):
+        info = self.chapters.get(filename)
+        return info["title"] if info else os.path.splitext(filename)[0]
+
+    def _prefix_postings(self, prefix):
+        """
+        Union of the postings of every token starting with `prefix`.
+        """
+        if self._vocab is None:
+            self._vocab = sorted(self.postings)
+        vocab = self._vocab
+        i = bisect_left(vocab, prefix)
+        matched = []
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            matched.append(self.postings[vocab[i]])
+            i += 1
+        if len(matched) == 1:
+            return matched[0]
+        return set().union(*matched)
+
+    def search(self, query, limit=50):
+        """
+        Returns up to `limit` SearchEntry objects matching every token of `query`,
+        ordered by chapter filename, then page, then block.
+        """
+        tokens = self.tokenize(query)
+        if not tokens:
+            return []
+
+        # Exact tokens first, last one as prefix; intersect starting from the smallest set
+        sets = []
+        for tok in tokens[:-1]:
+            posting = self.postings.get(tok)
+            if not posting:
+                return []
+            sets.append(posting)
+        last = self._prefix_postings(tokens[-1])
+        if not last:
+            return []
+        sets.append(last)
+        sets.sort(key=len)
+
+        hits = set(sets[0])
+        for s in sets[1:]:
+            hits.intersection_update(s)
+            if not hits:
+                return []
+
+        docs = self.docs
+        return [docs[d] for d in heapq.nsmallest(
+            limit, hits,
+            key=lambda d: (docs[d].chapter, docs[d].section_index, docs[d].block_index)
+        )]
+
+# ---------- one index per process ----------
+
+_index_cache = {}
+
+def open_index(path=None):
+    """
+    Returns the SearchIndex at `path` (default SEARCH_INDEX_FILE), read from disk
+    only the first time; later calls (e.g., every return to the menu) reuse it.
+    """
+    path  = path or SEARCH_INDEX_FILE
+    index = _index_cache.get(path)
+    if index is None:
+        index = SearchIndex(path)
+        _index_cache[path] = index
+    return index
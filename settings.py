@@ -9,8 +9,30 @@ SCREEN_HEIGHT = 625
 BASE_DIR     = getattr(sys, '_MEIPASS', os.path.dirname(__file__))
 CHAPTERS_DIR = os.path.join(BASE_DIR, "chapters")
 
+# Directory for voice clips and background music (paths in chapters are relative to it)
+AUDIO_DIR    = os.path.join(BASE_DIR, "audio")
+
+# Packed, pre-parsed chapters (built with `python chapter_archive.py`).
+# Loose .yml files in CHAPTERS_DIR override chapters with the same filename.
+ARCHIVE_FILE = os.path.join(BASE_DIR, "chapters.pak")
+
 # File to store progress (pickle)
 SAVE_FILE    = os.path.join(BASE_DIR, "progress.pkl")
 
+# Folder for files the game writes and must keep between launches. In a PyInstaller
+# one-file build BASE_DIR is a temporary folder deleted on exit, so use the executable's folder.
+DATA_DIR     = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else BASE_DIR
+
+# Full-text search index over all chapters (pickle, rebuilt incrementally)
+SEARCH_INDEX_FILE = os.path.join(DATA_DIR, "search_index.pkl")
+
 # Text speed (seconds per character)
-TEXT_SPEED = 0.03
\ No newline at end of file
+TEXT_SPEED = 0.03
+
+# Backlog (scroll-back history): max number of blocks kept per session
+BACKLOG_SIZE = 1000
+
+# Text rendering backend: "font" (pygame.font) or "freetype" (pygame.freetype,
+# draws straight into the screen). FONT_KERNING only applies to "freetype".
+FONT_BACKEND = "font"
+FONT_KERNING = False
\ No newline at end of file